@@ -0,0 +1,255 @@
+import numpy as np
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, List
+
+from timeline_core import (BusinessDayCalendar, Contingency, ContingencyGraph, TimingType,
+                           business_calendar, calendar_for)
+from timeline_metrics import SIZE_BUCKETS, registry
+
+# Integer codes used for timing types in batch arrays
+TIMING_CODES = {
+    TimingType.FIXED_DATE: 0,
+    TimingType.DAYS_FROM_MUTUAL: 1,
+    TimingType.DAYS_BEFORE_CLOSING: 2,
+}
+
+
+@dataclass
+class ClosingDateSweep:
+    """Deadlines for one contingency set across a range of closing dates.
+
+    Row i of each (candidates, contingencies) array belongs to
+    closing_dates[i]; column j to names[j].
+    """
+    mutual_date: date
+    names: List[str]
+    closing_dates: np.ndarray            # (candidates,) datetime64[D]
+    closing_is_business_day: np.ndarray  # (candidates,) bool
+    deadlines: np.ndarray                # datetime64[D], NaT where not calculable
+    on_non_business_day: np.ndarray      # deadline falls on a weekend or holiday
+    before_non_business_day: np.ndarray  # deadline is the last business day before one
+    business_days: np.ndarray            # business days counted in each contingency window
+
+    def rows(self) -> List[dict]:
+        """Per-candidate summaries listing the contingencies that collide."""
+        result = []
+        for i, closing in enumerate(self.closing_dates.astype(object)):
+            result.append({
+                "closing_date": closing,
+                "closing_is_business_day": bool(self.closing_is_business_day[i]),
+                "deadlines": {n: None if np.isnat(d) else d.astype(object)
+                              for n, d in zip(self.names, self.deadlines[i])},
+                "on_non_business_day": [n for n, flag in zip(self.names, self.on_non_business_day[i]) if flag],
+                "before_non_business_day": [n for n, flag in zip(self.names, self.before_non_business_day[i])
+                                            if flag],
+                "business_days": dict(zip(self.names, self.business_days[i].tolist())),
+            })
+        return result
+
+
+BATCH_SIZE = registry.histogram("timeline_batch_size", "Items per batched calculation",
+                                SIZE_BUCKETS, labelnames=("operation",))
+_calculate_dates_size = BATCH_SIZE.labels("calculate_dates")
+_sweep_size = BATCH_SIZE.labels("closing_date_sweep")
+
+
+def _timing_codes(timing_types) -> np.ndarray:
+    """Converts TimingType members, their values or codes to an int8 array."""
+    values = np.asarray(timing_types)
+    if values.dtype.kind in "iu":
+        return values.astype(np.int8)
+    flat = values.ravel()
+    if values.dtype == object:
+        flat = np.array([v.value if isinstance(v, TimingType) else v for v in flat], dtype=str)
+    uniques, inverse = np.unique(flat, return_inverse=True)
+    unsupported = [u for u in uniques if TimingType(u) not in TIMING_CODES]
+    if unsupported:
+        # Anchored items depend on other rows' results; resolve them with ContingencyGraph
+        raise ValueError(f"Batch calculation does not support timing types: {', '.join(unsupported)}")
+    lookup = np.array([TIMING_CODES[TimingType(u)] for u in uniques], dtype=np.int8)
+    return lookup[inverse].reshape(values.shape)
+
+
+class BatchTimelineCalculator:
+    """Vectorized counterpart of TimelineCalculator for whole portfolios.
+
+    All inputs broadcast against each other NumPy-style, so one contingency
+    template can be applied to many deals by passing mutual_dates[:, None]
+    and closing_dates[:, None] alongside 1-D contingency spec arrays.
+    """
+
+    def __init__(self, calendar: BusinessDayCalendar = business_calendar):
+        self.calendar = calendar
+
+    def _busdaycalendar(self, first: np.datetime64, last: np.datetime64, span: int) -> np.busdaycalendar:
+        """Builds a NumPy business-day calendar covering the given dates."""
+        first_year = int(first.astype("datetime64[Y]").astype(int)) + 1970 - span
+        last_year = int(last.astype("datetime64[Y]").astype(int)) + 1970 + span
+        return np.busdaycalendar(weekmask="1111100",
+                                 holidays=np.array(self.calendar.holidays(first_year, last_year),
+                                                   dtype="datetime64[D]"))
+
+    def calculate_dates(self, mutual_dates, closing_dates, timing_types, days,
+                        fixed_dates=None, is_possession_dates=False) -> np.ndarray:
+        """Computes every contingency deadline in one vectorized pass.
+
+        Applies the same rules as TimelineCalculator.calculate_date: counts of
+        5 days or fewer are business days unless the contingency is a
+        possession date, and DAYS_BEFORE_CLOSING counts backward. Entries that
+        fail Contingency.is_valid or TimelineCalculator's date check come
+        back as NaT.
+        """
+        mutual = np.asarray(mutual_dates, dtype="datetime64[D]")
+        closing = np.asarray(closing_dates, dtype="datetime64[D]")
+        codes = _timing_codes(timing_types)
+        day_counts = np.asarray(days if days is not None else np.nan, dtype=float)
+        fixed = np.asarray(fixed_dates if fixed_dates is not None else np.datetime64("NaT"),
+                           dtype="datetime64[D]")
+        possession = np.asarray(is_possession_dates, dtype=bool)
+        mutual, closing, codes, day_counts, fixed, possession = np.broadcast_arrays(
+            mutual, closing, codes, day_counts, fixed, possession)
+
+        result = np.full(mutual.shape, np.datetime64("NaT"), dtype="datetime64[D]")
+        _calculate_dates_size.observe(result.size)
+        valid_deal = ~np.isnat(mutual) & ~np.isnat(closing) & (mutual < closing)
+
+        is_fixed = valid_deal & (codes == TIMING_CODES[TimingType.FIXED_DATE])
+        result[is_fixed] = fixed[is_fixed]
+
+        relative = valid_deal & ~is_fixed & (day_counts > 0)
+        if not relative.any():
+            return result
+
+        forward = codes == TIMING_CODES[TimingType.DAYS_FROM_MUTUAL]
+        base = np.where(forward, mutual, closing)
+        offsets = np.where(np.isnan(day_counts), 0, day_counts).astype(np.int64)
+        offsets = np.where(forward, offsets, -offsets)
+
+        business = relative & (np.abs(offsets) <= 5) & ~possession
+        calendar_days = relative & ~business
+        result[calendar_days] = base[calendar_days] + offsets[calendar_days].astype("timedelta64[D]")
+
+        if business.any():
+            bases = base[business]
+            steps = offsets[business]
+            busdaycal = self._busdaycalendar(bases.min(), bases.max(), span=1)
+            # Rolling toward the base date means a weekend or holiday base
+            # is never counted itself, matching the day-by-day walk.
+            result[business] = np.where(
+                steps > 0,
+                np.busday_offset(bases, steps, roll="backward", busdaycal=busdaycal),
+                np.busday_offset(bases, steps, roll="forward", busdaycal=busdaycal))
+        return result
+
+    @staticmethod
+    def contingency_arrays(contingencies: List[Contingency]) -> Dict[str, np.ndarray]:
+        """Converts Contingency objects to the spec arrays calculate_dates takes."""
+        return {
+            "timing_types": _timing_codes([c.timing_type for c in contingencies]),
+            "days": np.array([np.nan if c.days is None else c.days for c in contingencies], dtype=float),
+            "fixed_dates": np.array([c.fixed_date for c in contingencies], dtype="datetime64[D]"),
+            "is_possession_dates": np.array([c.is_possession_date for c in contingencies], dtype=bool),
+        }
+
+    def calculate_portfolio(self, mutual_dates, closing_dates, contingencies: List[Contingency],
+                            jurisdictions=None) -> np.ndarray:
+        """Applies one contingency list to many deals.
+
+        Returns a (deals, contingencies) datetime64[D] array. Without
+        `jurisdictions` every deal uses this calculator's calendar; with one
+        jurisdiction per deal, each jurisdiction's deals are calculated in
+        their own batch with that jurisdiction's calendar.
+        """
+        mutual = np.asarray(mutual_dates, dtype="datetime64[D]")[:, None]
+        closing = np.asarray(closing_dates, dtype="datetime64[D]")[:, None]
+        specs = self.contingency_arrays(contingencies)
+        if jurisdictions is None:
+            return self.calculate_dates(mutual, closing, **specs)
+
+        jurisdictions = np.asarray(jurisdictions)
+        result = np.full((len(mutual), len(contingencies)), np.datetime64("NaT"), dtype="datetime64[D]")
+        for jurisdiction in np.unique(jurisdictions):
+            rows = jurisdictions == jurisdiction
+            calculator = BatchTimelineCalculator(calendar_for(str(jurisdiction)))
+            result[rows] = calculator.calculate_dates(mutual[rows], closing[rows], **specs)
+        return result
+
+    def sweep_closing_dates(self, mutual_date: date, contingencies: List[Contingency],
+                            first_closing: date = None, days: int = 90) -> ClosingDateSweep:
+        """Evaluates a contingency set against every closing date in a window at once.
+
+        Candidates run from first_closing (default: the day after mutual) for
+        `days` days. Deadlines come from calculate_dates over a (candidates,
+        contingencies) grid rather than a calculator per candidate; anchored
+        contingencies are filled in afterwards, one column per item in
+        dependency order, counting from their anchor's column. A contingency
+        window is the stretch the contingency counts: from its base date
+        (mutual, closing for DAYS_BEFORE_CLOSING, or the anchor's deadline)
+        to its deadline.
+        """
+        mutual = np.datetime64(mutual_date, "D")
+        first = np.datetime64(first_closing, "D") if first_closing else mutual + 1
+        closing = first + np.arange(days)
+        _sweep_size.observe(days)
+
+        names = [c.name for c in contingencies]
+        anchored = [c.timing_type == TimingType.DAYS_AFTER_CONTINGENCY for c in contingencies]
+        plain = [c for c, is_anchored in zip(contingencies, anchored) if not is_anchored]
+        plain_columns = [j for j, is_anchored in enumerate(anchored) if not is_anchored]
+
+        deadlines = np.full((days, len(contingencies)), np.datetime64("NaT"), dtype="datetime64[D]")
+        base = np.full(deadlines.shape, np.datetime64("NaT"), dtype="datetime64[D]")
+        backward = np.zeros(len(contingencies), dtype=bool)
+        if plain:
+            specs = self.contingency_arrays(plain)
+            deadlines[:, plain_columns] = self.calculate_dates(mutual, closing[:, None], **specs)
+            backward[plain_columns] = specs["timing_types"] == TIMING_CODES[TimingType.DAYS_BEFORE_CLOSING]
+            base[:, plain_columns] = np.where(backward[plain_columns], closing[:, None], mutual)
+
+        if any(anchored):
+            # The graph validates anchors and cycles and yields a dependency
+            # order; its dates do not depend on closing, so any valid one will do.
+            graph = ContingencyGraph(mutual_date, mutual_date + timedelta(days=1))
+            graph.sync(contingencies)
+            graph.evaluate()
+            column = {name: j for j, name in enumerate(names)}
+            for name in graph.last_recomputed:
+                j = column[name]
+                contingency = contingencies[j]
+                if not anchored[j] or not contingency.is_valid():
+                    continue
+                anchor_dates = deadlines[:, column[contingency.anchor]]
+                # Counting forward from the anchor is a days-from-mutual count
+                # with the anchor date as mutual; closing only has to follow it.
+                deadlines[:, j] = self.calculate_dates(
+                    anchor_dates, anchor_dates + 1, TimingType.DAYS_FROM_MUTUAL, contingency.days,
+                    is_possession_dates=contingency.is_possession_date)
+                base[:, j] = anchor_dates
+
+        valid = ~np.isnat(deadlines)
+        safe = np.where(valid, deadlines, mutual)
+        safe_base = np.where(valid, base, mutual)
+        span = np.concatenate(([mutual], closing, safe.ravel(), safe_base.ravel()))
+        busdaycal = self._busdaycalendar(span.min(), span.max(), span=1)
+        on_non_business = valid & ~np.is_busday(safe, busdaycal=busdaycal)
+        before_non_business = (valid & ~on_non_business &
+                               ~np.is_busday(safe + 1, busdaycal=busdaycal))
+
+        # Forward windows count (base, deadline]; backward ones [deadline, base)
+        business_days = np.where(
+            backward,
+            np.busday_count(safe, safe_base, busdaycal=busdaycal),
+            np.busday_count(safe_base + 1, safe + 1, busdaycal=busdaycal))
+        business_days = np.where(valid, business_days, 0)
+
+        return ClosingDateSweep(
+            mutual_date=mutual_date,
+            names=names,
+            closing_dates=closing,
+            closing_is_business_day=np.is_busday(closing, busdaycal=busdaycal),
+            deadlines=deadlines,
+            on_non_business_day=on_non_business,
+            before_non_business_day=before_non_business,
+            business_days=business_days,
+        )
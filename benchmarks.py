@@ -0,0 +1,242 @@
+"""Reproducible benchmarks for the calculation core and the API.
+
+    python benchmarks.py --output results.json
+    python benchmarks.py --baseline results.json --threshold 0.15
+
+Results are JSON keyed by benchmark name. With --baseline, any benchmark
+whose median time per operation grew by more than the threshold is
+reported as a regression and the exit status is 1. Importing the
+calculation core is also checked against a fixed budget on every run: it
+must stay under IMPORT_BUDGET_SECONDS and must not pull in Streamlit.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from timeline_core import (Contingency, DateCalculator, DeadlineCache, HolidayUtils,
+                           TimelineCalculator, TimingType)
+
+SEED = 20240101
+
+# Cold import of timeline_core in a fresh interpreter, in seconds
+IMPORT_BUDGET_SECONDS = 0.15
+# Modules the calculation core must never import
+FORBIDDEN_CORE_IMPORTS = ("streamlit", "fastapi", "numpy")
+
+# Templates most deals are built from, in rough order of frequency
+CONTINGENCY_MIX = [
+    Contingency("Earnest Money", TimingType.DAYS_FROM_MUTUAL, days=2),
+    Contingency("Seller Disclosure Review", TimingType.DAYS_FROM_MUTUAL, days=3),
+    Contingency("Inspection", TimingType.DAYS_FROM_MUTUAL, days=10),
+    Contingency("Title Review", TimingType.DAYS_FROM_MUTUAL, days=5),
+    Contingency("Financing", TimingType.DAYS_FROM_MUTUAL, days=21),
+    Contingency("Appraisal", TimingType.DAYS_BEFORE_CLOSING, days=7),
+    Contingency("Final Walkthrough", TimingType.DAYS_BEFORE_CLOSING, days=1),
+    Contingency("Possession", TimingType.DAYS_BEFORE_CLOSING, days=3, is_possession_date=True),
+]
+
+
+def measure(func: Callable[[], object], operations: int, repeat: int = 5) -> Dict[str, float]:
+    """Times func `repeat` times; reports seconds per operation."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) / operations)
+    return {
+        "median": statistics.median(timings),
+        "min": min(timings),
+        "max": max(timings),
+        "ops_per_sec": 1 / statistics.median(timings),
+        "operations": operations,
+    }
+
+
+def _random_dates(rng: random.Random, count: int) -> List[date]:
+    start = date(2020, 1, 1)
+    return [start + timedelta(days=rng.randrange(365 * 10)) for _ in range(count)]
+
+
+def bench_core(rng: random.Random, scale: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    years = [rng.randrange(1990, 2060) for _ in range(scale)]
+    results["holidays.get_wa_state_holidays"] = measure(
+        lambda: [HolidayUtils.get_wa_state_holidays(y) for y in years], scale)
+
+    days = _random_dates(rng, scale)
+    results["holidays.is_business_day"] = measure(
+        lambda: [HolidayUtils.is_business_day(d) for d in days], scale)
+
+    offsets = [(d, rng.randint(1, 5), rng.random() < 0.5) for d in days]
+    results["date_calculator.calculate_business_days"] = measure(
+        lambda: [DateCalculator.calculate_business_days(d, n, f) for d, n, f in offsets], scale)
+
+    offsets = [(d, rng.randint(6, 45), rng.random() < 0.5) for d in days]
+    results["date_calculator.calculate_calendar_days"] = measure(
+        lambda: [DateCalculator.calculate_calendar_days(d, n, f) for d, n, f in offsets], scale)
+
+    deals = [(m, m + timedelta(days=rng.randint(21, 60))) for m in _random_dates(rng, scale // 10)]
+    operations = len(deals) * len(CONTINGENCY_MIX)
+
+    def timelines(cache: Optional[DeadlineCache]):
+        def run():
+            for mutual, closing in deals:
+                calculator = TimelineCalculator(mutual, closing, cache=cache)
+                for contingency in CONTINGENCY_MIX:
+                    calculator.calculate_date(contingency)
+        return run
+
+    results["timeline_calculator.calculate_date.uncached"] = measure(timelines(None), operations)
+    results["timeline_calculator.calculate_date.cached"] = measure(
+        timelines(DeadlineCache(maxsize=operations)), operations)
+
+    windows = [(TimelineCalculator(mutual, closing), mutual + timedelta(days=rng.randint(1, 20)))
+               for mutual, closing in deals]
+    results["timeline_calculator.solve_days_all"] = measure(
+        lambda: [calculator.solve_days_all(earliest, earliest + timedelta(days=4))
+                 for calculator, earliest in windows], len(windows))
+    return results
+
+
+def measure_core_import() -> Tuple[float, List[str]]:
+    """Imports timeline_core in a fresh interpreter.
+
+    Returns the seconds the import took and the FORBIDDEN_CORE_IMPORTS it
+    loaded.
+    """
+    script = ("import sys, time; started = time.perf_counter(); import timeline_core; "
+              "elapsed = time.perf_counter() - started; "
+              f"print(elapsed, *[m for m in {FORBIDDEN_CORE_IMPORTS!r} if m in sys.modules])")
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)),
+                            check=True).stdout.split()
+    return float(output[0]), output[1:]
+
+
+def bench_import(repeat: int = 5) -> Dict[str, Dict[str, float]]:
+    """Times a cold `import timeline_core` in fresh interpreters."""
+    timings, forbidden = [], 0
+    for _ in range(repeat):
+        elapsed, loaded = measure_core_import()
+        timings.append(elapsed)
+        forbidden = max(forbidden, len(loaded))
+    return {"import.timeline_core": {
+        "median": statistics.median(timings),
+        "min": min(timings),
+        "max": max(timings),
+        "ops_per_sec": 1 / statistics.median(timings),
+        "operations": 1,
+        "forbidden_imports": forbidden,
+    }}
+
+
+def check_budgets(results: Dict[str, Dict[str, float]]) -> List[str]:
+    """Returns a message for each fixed budget the results exceed."""
+    failures = []
+    result = results.get("import.timeline_core")
+    if result is not None:
+        if result["forbidden_imports"]:
+            failures.append(f"importing timeline_core loads one of {', '.join(FORBIDDEN_CORE_IMPORTS)}")
+        if result["median"] > IMPORT_BUDGET_SECONDS:
+            failures.append(f"importing timeline_core took {result['median'] * 1e3:.0f}ms, "
+                            f"budget is {IMPORT_BUDGET_SECONDS * 1e3:.0f}ms")
+    return failures
+
+
+def bench_api(rng: random.Random, scale: int) -> Dict[str, Dict[str, float]]:
+    try:
+        from fastapi.testclient import TestClient
+        from main import app
+    except ImportError as e:
+        print(f"Skipping API benchmarks: {e}", file=sys.stderr)
+        return {}
+
+    client = TestClient(app)
+    requests = []
+    for mutual in _random_dates(rng, max(scale // 100, 10)):
+        contingencies = rng.sample(CONTINGENCY_MIX, rng.randint(3, len(CONTINGENCY_MIX)))
+        requests.append({
+            "mutual_date": mutual.isoformat(),
+            "closing_date": (mutual + timedelta(days=rng.randint(21, 60))).isoformat(),
+            "contingencies": [{"name": c.name, "timing_type": c.timing_type.value, "days": c.days,
+                               "is_possession_date": c.is_possession_date} for c in contingencies],
+        })
+
+    latencies = []
+
+    def run():
+        for payload in requests:
+            started = time.perf_counter()
+            response = client.post("/calculate-timeline", json=payload)
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+
+    result = measure(run, len(requests))
+    latencies.sort()
+    result["p50_latency"] = latencies[len(latencies) // 2]
+    result["p95_latency"] = latencies[int(len(latencies) * 0.95)]
+    return {"api.calculate_timeline": result}
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> List[str]:
+    """Returns a message for each benchmark slower than baseline by more than threshold."""
+    regressions = []
+    for name, result in sorted(results.items()):
+        if name not in baseline:
+            continue
+        before = baseline[name]["median"]
+        change = (result["median"] - before) / before
+        status = "REGRESSION" if change > threshold else "ok"
+        print(f"{name:55s} {before * 1e6:10.2f}us -> {result['median'] * 1e6:10.2f}us "
+              f"{change:+7.1%}  {status}")
+        if change > threshold:
+            regressions.append(f"{name} is {change:.1%} slower than baseline")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the timeline calculation core and API.")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="allowed slowdown before flagging a regression (default: 0.15)")
+    parser.add_argument("--scale", type=int, default=2000, help="operations per core benchmark")
+    parser.add_argument("--skip-api", action="store_true", help="skip the FastAPI benchmarks")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(SEED)
+    results = bench_import()
+    results.update(bench_core(rng, args.scale))
+    if not args.skip_api:
+        results.update(bench_api(rng, args.scale))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"python": platform.python_version(), "scale": args.scale,
+                       "results": results}, f, indent=2, sort_keys=True)
+
+    failures = check_budgets(results)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        failures += compare(results, baseline, args.threshold)
+    else:
+        for name, result in sorted(results.items()):
+            print(f"{name:55s} {result['median'] * 1e6:10.2f}us/op {result['ops_per_sec']:12,.0f} ops/sec")
+
+    for message in failures:
+        print(message, file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
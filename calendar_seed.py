@@ -0,0 +1,62 @@
+"""Business-day calendars as a dbt seed for set-based deadline models.
+
+Writes one row per jurisdiction and day with the day's business-day flag
+and running business-day number, the same prefix sums BusinessDayCalendar
+bisects. The dbt models under models/timeline turn business-day offsets
+into equality joins on that number:
+
+    python calendar_seed.py                    # every jurisdiction, 1990-2060
+    python calendar_seed.py WA --first-year 2015 --last-year 2035
+    dbt seed && dbt build --select timeline
+
+Business-day numbers are only comparable within one jurisdiction and one
+generated file; deadlines that fall outside the generated years come out
+null.
+"""
+import argparse
+import csv
+import os
+from datetime import date, timedelta
+from typing import List, Optional
+
+from holiday_rules import COMPILE_FIRST_YEAR, COMPILE_LAST_YEAR, JURISDICTIONS, holidays_for
+from timeline_core import BusinessDayCalendar
+
+SEED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "seeds", "business_day_calendar.csv")
+SEED_COLUMNS = ["jurisdiction", "calendar_date", "is_business_day", "business_day_number"]
+
+
+def write_calendar_seed(path: str, jurisdictions: List[str], first_year: int = COMPILE_FIRST_YEAR,
+                        last_year: int = COMPILE_LAST_YEAR) -> int:
+    """Writes the calendar seed CSV; returns the number of rows written."""
+    rows = 0
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(SEED_COLUMNS)
+        for jurisdiction in jurisdictions:
+            calendar = BusinessDayCalendar(holidays_for(jurisdiction), first_year, last_year,
+                                           name=jurisdiction)
+            day, last = date(first_year, 1, 1), date(last_year, 12, 31)
+            while day <= last:
+                writer.writerow([jurisdiction, day.isoformat(),
+                                 "true" if calendar.is_business_day(day) else "false",
+                                 calendar.business_days_through(day)])
+                day += timedelta(days=1)
+                rows += 1
+    return rows
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Write business-day calendars as a dbt seed.")
+    parser.add_argument("jurisdictions", nargs="*", default=sorted(JURISDICTIONS),
+                        help="jurisdictions to include (default: all)")
+    parser.add_argument("--first-year", type=int, default=COMPILE_FIRST_YEAR)
+    parser.add_argument("--last-year", type=int, default=COMPILE_LAST_YEAR)
+    parser.add_argument("--output", default=SEED_PATH)
+    args = parser.parse_args(argv)
+    rows = write_calendar_seed(args.output, args.jurisdictions, args.first_year, args.last_year)
+    print(f"{args.output}: {rows} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import asyncio
+import heapq
+import inspect
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from itertools import count
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+from zoneinfo import ZoneInfo
+
+from timeline_core import DEFAULT_JURISDICTION, Contingency, resolve_dates
+
+logger = logging.getLogger(__name__)
+
+# Deadlines fall due at 9:00 PM local time, as shown by format_date
+DEADLINE_CUTOFF = time(21, 0)
+DEFAULT_TIMEZONE = ZoneInfo("America/Los_Angeles")
+DEFAULT_LEAD_TIMES = (timedelta(hours=48), timedelta(0))
+
+
+@dataclass(order=True)
+class DeadlineAlert:
+    """An alert due `lead_time` before a contingency's 9:00 PM cutoff."""
+    fire_at: datetime
+    deal_id: str = field(compare=False)
+    contingency_name: str = field(compare=False)
+    deadline_date: date = field(compare=False)
+    lead_time: timedelta = field(compare=False)
+
+
+AlertCallback = Callable[[DeadlineAlert], Union[None, Awaitable[None]]]
+# (contingency_name, deadline_date, lead_time) of an alert that has fired
+AlertKey = Tuple[str, date, timedelta]
+
+
+class DeadlineScheduler:
+    """Fires callbacks ahead of contingency deadlines across many deals.
+
+    Pending alerts sit in a min-heap ordered by fire time and the run loop
+    sleeps until the earliest one. Updating or removing a deal only touches
+    that deal: its old heap entries are invalidated by a per-deal generation
+    number and discarded lazily when they reach the top. Alerts that have
+    fired are remembered per deal until the deadline they were for moves, so
+    re-syncing a deal never sends the same alert twice.
+    """
+
+    def __init__(self, callback: AlertCallback,
+                 lead_times: Sequence[timedelta] = DEFAULT_LEAD_TIMES,
+                 tz: ZoneInfo = DEFAULT_TIMEZONE,
+                 now: Optional[Callable[[], datetime]] = None):
+        self.callback = callback
+        self.lead_times = tuple(lead_times)
+        self.tz = tz
+        self._now = now or (lambda: datetime.now(self.tz))
+        self._heap: List[tuple] = []
+        self._generations: Dict[str, int] = {}
+        self._queued: Dict[str, int] = {}
+        self._fired: Dict[str, Set[AlertKey]] = {}
+        self._sequence = count()
+        self._stale = 0
+        self._wakeup = asyncio.Event()
+
+    def cutoff(self, deadline_date: date) -> datetime:
+        """Returns the moment a deadline falls due."""
+        return datetime.combine(deadline_date, DEADLINE_CUTOFF, tzinfo=self.tz)
+
+    def update_deal(self, deal_id: str, mutual_date: date, closing_date: date,
+                    contingencies: List[Contingency], jurisdiction: str = DEFAULT_JURISDICTION):
+        """Replaces a deal's pending alerts with ones for its current deadlines.
+
+        Alerts whose lead time has already passed fire immediately as long as
+        the deadline itself has not and they have not fired for that deadline
+        already; alerts for past deadlines are dropped.
+        """
+        deadlines = resolve_dates(mutual_date, closing_date, contingencies, jurisdiction=jurisdiction)
+        generation = self._invalidate(deal_id)
+        now = self._now()
+        earliest = self._heap[0][0] if self._heap else None
+
+        fired = self._fired.get(deal_id)
+        if fired:
+            # Keys for deadlines that moved, or have passed, can never match again
+            current = {(c.name, d) for c, d in zip(contingencies, deadlines)
+                       if d is not None and self.cutoff(d) >= now}
+            fired = {key for key in fired if key[:2] in current}
+            if fired:
+                self._fired[deal_id] = fired
+            else:
+                del self._fired[deal_id]
+
+        for contingency, deadline_date in zip(contingencies, deadlines):
+            if deadline_date is None:
+                continue
+            cutoff = self.cutoff(deadline_date)
+            if cutoff < now:
+                continue
+            for lead_time in self.lead_times:
+                if fired and (contingency.name, deadline_date, lead_time) in fired:
+                    continue
+                alert = DeadlineAlert(max(cutoff - lead_time, now), deal_id,
+                                      contingency.name, deadline_date, lead_time)
+                heapq.heappush(self._heap, (alert.fire_at, next(self._sequence), generation, alert))
+                self._queued[deal_id] = self._queued.get(deal_id, 0) + 1
+
+        if self._heap and (earliest is None or self._heap[0][0] < earliest):
+            self._wakeup.set()
+
+    def remove_deal(self, deal_id: str):
+        """Cancels all pending alerts for a deal."""
+        self._invalidate(deal_id)
+        self._generations.pop(deal_id, None)
+        self._fired.pop(deal_id, None)
+
+    def _invalidate(self, deal_id: str) -> int:
+        """Marks a deal's queued alerts stale and returns its new generation."""
+        generation = self._generations.get(deal_id, 0) + 1
+        self._generations[deal_id] = generation
+        self._stale += self._queued.pop(deal_id, 0)
+        if self._stale > len(self._heap) // 2:
+            self._compact()
+        return generation
+
+    def _is_current(self, entry: tuple) -> bool:
+        return self._generations.get(entry[3].deal_id) == entry[2]
+
+    def _compact(self):
+        """Drops stale entries once they make up half the heap."""
+        self._heap = [entry for entry in self._heap if self._is_current(entry)]
+        heapq.heapify(self._heap)
+        self._stale = 0
+
+    def pending(self) -> List[DeadlineAlert]:
+        """Returns the current alerts in firing order."""
+        return [entry[3] for entry in sorted(self._heap) if self._is_current(entry)]
+
+    def next_alert(self) -> Optional[DeadlineAlert]:
+        """Returns the earliest current alert, discarding stale ones on the way."""
+        while self._heap and not self._is_current(self._heap[0]):
+            heapq.heappop(self._heap)
+            self._stale = max(self._stale - 1, 0)
+        return self._heap[0][3] if self._heap else None
+
+    async def run(self):
+        """Sleeps until each alert is due and fires it; runs until cancelled."""
+        while True:
+            alert = self.next_alert()
+            delay = None if alert is None else (alert.fire_at - self._now()).total_seconds()
+            if delay is None or delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._heap)
+            self._queued[alert.deal_id] -= 1
+            if not self._queued[alert.deal_id]:
+                del self._queued[alert.deal_id]
+            self._fired.setdefault(alert.deal_id, set()).add(
+                (alert.contingency_name, alert.deadline_date, alert.lead_time))
+            # One failing alert must not stop alerts for every other deal
+            try:
+                result = self.callback(alert)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception("Deadline alert callback failed for %s / %s",
+                                 alert.deal_id, alert.contingency_name)
@@ -0,0 +1,195 @@
+import hashlib
+import sqlite3
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional
+
+from timeline_core import DEFAULT_JURISDICTION, Contingency, TimingType, resolve_dates
+
+# Statuses mirror ContingencyStatus in frontend/src/types/timeline.ts; archiving
+# is a flag on the deal and leaves them untouched
+DEFAULT_STATUS = "not_started"
+CLOSED_STATUSES = ("completed", "waived")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS deals (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    mutual_date TEXT NOT NULL,
+    closing_date TEXT NOT NULL,
+    jurisdiction TEXT NOT NULL DEFAULT 'WA',
+    is_archived INTEGER NOT NULL DEFAULT 0,
+    inputs_hash TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    last_modified TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS contingencies (
+    deal_id TEXT NOT NULL REFERENCES deals(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    timing_type TEXT NOT NULL,
+    days INTEGER,
+    fixed_date TEXT,
+    description TEXT,
+    is_possession_date INTEGER NOT NULL DEFAULT 0,
+    anchor TEXT,
+    status TEXT NOT NULL,
+    deadline_date TEXT,
+    PRIMARY KEY (deal_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_contingencies_deadline_status
+    ON contingencies (deadline_date, status);
+"""
+
+
+@dataclass
+class DueDeadline:
+    """A contingency deadline returned by DealStore.due_within."""
+    deal_id: str
+    deal_name: Optional[str]
+    contingency_name: str
+    deadline_date: date
+    status: str
+
+
+def inputs_hash(mutual_date: date, closing_date: date, contingencies: Iterable[Contingency],
+                jurisdiction: str = DEFAULT_JURISDICTION) -> str:
+    """Fingerprints everything that affects a deal's calculated deadlines."""
+    parts = [mutual_date.isoformat(), closing_date.isoformat(), jurisdiction]
+    for c in contingencies:
+        parts.append(f"{c.name}|{c.timing_type.value}|{c.days}|{c.fixed_date}|{c.is_possession_date}"
+                     + (f"|{c.anchor}" if c.anchor else ""))
+    return hashlib.sha1("\n".join(parts).encode()).hexdigest()
+
+
+class DealStore:
+    """SQLite-backed store of deals and their calculated deadlines.
+
+    Deadlines are written alongside each contingency and indexed on
+    (deadline_date, status), so "what's due" queries are index range scans
+    rather than timeline recalculations. A deal's deadlines are recalculated
+    only when its dates or contingency inputs change.
+    """
+
+    def __init__(self, path: str = "deals.db"):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.executescript(SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(contingencies)")}
+        if "anchor" not in columns:
+            # Databases created before contingencies could be anchored to each other
+            self._conn.execute("ALTER TABLE contingencies ADD COLUMN anchor TEXT")
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(deals)")}
+        if "jurisdiction" not in columns:
+            # Databases created before per-jurisdiction calendars; every deal was WA
+            self._conn.execute("ALTER TABLE deals ADD COLUMN jurisdiction TEXT NOT NULL DEFAULT 'WA'")
+        with self._conn:
+            # Archiving used to overwrite statuses with 'archived', which is not a
+            # ContingencyStatus; restoring reset them the same way
+            self._conn.execute("UPDATE contingencies SET status = ? WHERE status = 'archived'",
+                               (DEFAULT_STATUS,))
+
+    def close(self):
+        self._conn.close()
+
+    def save_deal(self, deal_id: str, mutual_date: date, closing_date: date,
+                  contingencies: List[Contingency], name: Optional[str] = None,
+                  statuses: Optional[List[str]] = None,
+                  jurisdiction: str = DEFAULT_JURISDICTION) -> bool:
+        """Creates or updates a deal; returns True if deadlines were recalculated."""
+        fingerprint = inputs_hash(mutual_date, closing_date, contingencies, jurisdiction)
+        now = datetime.now().isoformat(timespec="seconds")
+        row = self._conn.execute("SELECT inputs_hash FROM deals WHERE id = ?", (deal_id,)).fetchone()
+
+        with self._conn:
+            if row is not None and row[0] == fingerprint:
+                # Descriptions do not affect deadlines, so they are not in the
+                # fingerprint but still have to be written
+                self._conn.execute("UPDATE deals SET name = ?, last_modified = ? WHERE id = ?",
+                                   (name, now, deal_id))
+                self._conn.executemany(
+                    "UPDATE contingencies SET description = ? WHERE deal_id = ? AND position = ?",
+                    [(c.description, deal_id, i) for i, c in enumerate(contingencies)])
+                if statuses is not None:
+                    self._write_statuses(deal_id, statuses)
+                return False
+
+            deadlines = resolve_dates(mutual_date, closing_date, contingencies, jurisdiction=jurisdiction)
+            if statuses is None:
+                previous = dict(self._conn.execute(
+                    "SELECT position, status FROM contingencies WHERE deal_id = ?", (deal_id,)))
+                statuses = [previous.get(i, DEFAULT_STATUS) for i in range(len(contingencies))]
+
+            self._conn.execute(
+                """INSERT INTO deals (id, name, mutual_date, closing_date, jurisdiction, inputs_hash,
+                                      created_at, last_modified)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(id) DO UPDATE SET
+                       name = excluded.name, mutual_date = excluded.mutual_date,
+                       closing_date = excluded.closing_date, jurisdiction = excluded.jurisdiction,
+                       inputs_hash = excluded.inputs_hash, last_modified = excluded.last_modified""",
+                (deal_id, name, mutual_date.isoformat(), closing_date.isoformat(), jurisdiction,
+                 fingerprint, now, now))
+            self._conn.execute("DELETE FROM contingencies WHERE deal_id = ?", (deal_id,))
+            self._conn.executemany(
+                """INSERT INTO contingencies (deal_id, position, name, timing_type, days, fixed_date,
+                                              description, is_possession_date, anchor, status,
+                                              deadline_date)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                [(deal_id, i, c.name, c.timing_type.value, c.days,
+                  c.fixed_date.isoformat() if c.fixed_date else None, c.description,
+                  int(c.is_possession_date), c.anchor, status,
+                  deadline.isoformat() if deadline else None)
+                 for i, (c, status, deadline) in enumerate(zip(contingencies, statuses, deadlines))])
+        return True
+
+    def _write_statuses(self, deal_id: str, statuses: List[str]):
+        self._conn.executemany(
+            "UPDATE contingencies SET status = ? WHERE deal_id = ? AND position = ?",
+            [(status, deal_id, i) for i, status in enumerate(statuses)])
+
+    def set_status(self, deal_id: str, position: int, status: str):
+        """Updates one contingency's status without touching its deadline."""
+        with self._conn:
+            self._conn.execute("UPDATE contingencies SET status = ? WHERE deal_id = ? AND position = ?",
+                               (status, deal_id, position))
+
+    def archive_deal(self, deal_id: str, archived: bool = True):
+        """Archives or restores a deal, hiding or showing its deadlines in queries.
+
+        Contingency statuses are kept as they are, so a restored deal comes
+        back with its completed and waived items still closed.
+        """
+        with self._conn:
+            self._conn.execute("UPDATE deals SET is_archived = ? WHERE id = ?", (int(archived), deal_id))
+
+    def delete_deal(self, deal_id: str):
+        with self._conn:
+            self._conn.execute("DELETE FROM deals WHERE id = ?", (deal_id,))
+
+    def load_contingencies(self, deal_id: str) -> List[Contingency]:
+        """Returns a deal's contingencies in their saved order."""
+        rows = self._conn.execute(
+            """SELECT name, timing_type, days, fixed_date, description, is_possession_date, anchor
+               FROM contingencies WHERE deal_id = ? ORDER BY position""", (deal_id,))
+        return [Contingency(name=name, timing_type=TimingType(timing_type), days=days,
+                            fixed_date=date.fromisoformat(fixed) if fixed else None,
+                            description=description, is_possession_date=bool(possession),
+                            anchor=anchor)
+                for name, timing_type, days, fixed, description, possession, anchor in rows]
+
+    def due_within(self, days: int, today: Optional[date] = None) -> List[DueDeadline]:
+        """Returns open deadlines from today through the next `days` days on active deals."""
+        today = today or date.today()
+        placeholders = ", ".join("?" for _ in CLOSED_STATUSES)
+        rows = self._conn.execute(
+            f"""SELECT c.deal_id, d.name, c.name, c.deadline_date, c.status
+                FROM contingencies AS c INDEXED BY idx_contingencies_deadline_status
+                JOIN deals AS d ON d.id = c.deal_id
+                WHERE c.deadline_date BETWEEN ? AND ?
+                  AND c.status NOT IN ({placeholders})
+                  AND d.is_archived = 0
+                ORDER BY c.deadline_date, c.deal_id, c.position""",
+            (today.isoformat(), (today + timedelta(days=days)).isoformat(), *CLOSED_STATUSES))
+        return [DueDeadline(deal_id, deal_name, name, date.fromisoformat(deadline), status)
+                for deal_id, deal_name, name, deadline, status in rows]
@@ -0,0 +1,163 @@
+"""Declarative holiday rules per jurisdiction and the calendar compile step.
+
+Each jurisdiction is a list of HolidayRule entries. Compiling turns a rule
+set into a binary business-day calendar file that BusinessDayCalendar
+memory-maps, so worker processes share the pages and skip holiday
+generation at startup:
+
+    python holiday_rules.py                    # every jurisdiction, 1990-2060
+    python holiday_rules.py OR ID --first-year 2000 --last-year 2040
+"""
+import argparse
+import hashlib
+import os
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional
+
+# timeline_core builds its calendars from these rules, so this module must not
+# import it at load time; the compile step imports it when it runs.
+
+# Observance rules for holidays that fall on a weekend
+OBSERVE_ACTUAL = "actual"                   # no shift
+NEAREST_WEEKDAY = "nearest_weekday"         # Saturday -> Friday, Sunday -> Monday
+SUNDAY_TO_MONDAY = "sunday_to_monday"       # Saturday not observed, Sunday -> Monday
+
+COMPILE_FIRST_YEAR = 1990
+COMPILE_LAST_YEAR = 2060
+
+
+@dataclass(frozen=True)
+class HolidayRule:
+    """One holiday: a fixed date, or the nth (or last, nth=-1) weekday of a month."""
+    name: str
+    month: int
+    day: Optional[int] = None
+    weekday: Optional[int] = None
+    nth: Optional[int] = None
+    offset: int = 0
+    observance: str = NEAREST_WEEKDAY
+
+    def date_for(self, year: int) -> date:
+        """Returns the observed date of this holiday in a year."""
+        if self.day is not None:
+            actual = date(year, self.month, self.day)
+        elif self.nth == -1:
+            actual = last_weekday_of_month(year, self.month, self.weekday)
+        else:
+            actual = nth_weekday_of_month(year, self.month, self.weekday, self.nth)
+        actual += timedelta(days=self.offset)
+        return observe(actual, self.observance)
+
+
+def nth_weekday_of_month(year: int, month: int, weekday: int, nth: int) -> date:
+    """Returns the nth occurrence of a weekday in a given month."""
+    first_day = date(year, month, 1)
+    offset = (weekday - first_day.weekday()) % 7
+    return first_day + timedelta(days=offset + (nth - 1) * 7)
+
+
+def last_weekday_of_month(year: int, month: int, weekday: int) -> date:
+    """Returns the last occurrence of a weekday in a given month."""
+    next_month = date(year, month + 1, 1) if month < 12 else date(year + 1, 1, 1)
+    last_day = next_month - timedelta(days=1)
+    offset = (weekday - last_day.weekday()) % 7
+    return last_day - timedelta(days=(7 - offset) if offset else 0)
+
+
+def nearest_weekday(holiday: date) -> date:
+    """Moves a Saturday holiday to Friday and a Sunday one to Monday."""
+    if holiday.weekday() == 5:
+        return holiday - timedelta(days=1)
+    if holiday.weekday() == 6:
+        return holiday + timedelta(days=1)
+    return holiday
+
+
+def observe(holiday: date, observance: str) -> date:
+    """Applies an observance rule to a holiday's actual date."""
+    if observance == NEAREST_WEEKDAY:
+        return nearest_weekday(holiday)
+    if observance == SUNDAY_TO_MONDAY and holiday.weekday() == 6:
+        return holiday + timedelta(days=1)
+    if observance in (OBSERVE_ACTUAL, SUNDAY_TO_MONDAY):
+        return holiday
+    raise ValueError(f"Unknown observance rule: {observance}")
+
+
+NEW_YEARS_DAY = HolidayRule("New Year's Day", 1, day=1)
+MLK_DAY = HolidayRule("Martin Luther King Jr. Day", 1, weekday=0, nth=3)
+PRESIDENTS_DAY = HolidayRule("Presidents' Day", 2, weekday=0, nth=3)
+MEMORIAL_DAY = HolidayRule("Memorial Day", 5, weekday=0, nth=-1)
+JUNETEENTH = HolidayRule("Juneteenth", 6, day=19)
+INDEPENDENCE_DAY = HolidayRule("Independence Day", 7, day=4)
+LABOR_DAY = HolidayRule("Labor Day", 9, weekday=0, nth=1)
+COLUMBUS_DAY = HolidayRule("Columbus Day", 10, weekday=0, nth=2)
+VETERANS_DAY = HolidayRule("Veterans Day", 11, day=11)
+THANKSGIVING = HolidayRule("Thanksgiving", 11, weekday=3, nth=4)
+CHRISTMAS = HolidayRule("Christmas", 12, day=25)
+
+JURISDICTIONS: Dict[str, List[HolidayRule]] = {
+    # Also the default calendar; HolidayUtils.get_wa_state_holidays reads it
+    "WA": [NEW_YEARS_DAY, JUNETEENTH, INDEPENDENCE_DAY, VETERANS_DAY, CHRISTMAS,
+           MLK_DAY, PRESIDENTS_DAY, MEMORIAL_DAY, LABOR_DAY, THANKSGIVING],
+    "OR": [NEW_YEARS_DAY, MLK_DAY, PRESIDENTS_DAY, MEMORIAL_DAY, JUNETEENTH, INDEPENDENCE_DAY,
+           LABOR_DAY, VETERANS_DAY, THANKSGIVING, CHRISTMAS],
+    "ID": [NEW_YEARS_DAY, MLK_DAY, PRESIDENTS_DAY, MEMORIAL_DAY, INDEPENDENCE_DAY, LABOR_DAY,
+           COLUMBUS_DAY, VETERANS_DAY, THANKSGIVING, CHRISTMAS],
+}
+
+
+def rules_for(jurisdiction: str) -> List[HolidayRule]:
+    """Returns a jurisdiction's rule set."""
+    try:
+        return JURISDICTIONS[jurisdiction]
+    except KeyError:
+        raise ValueError(f"Unknown jurisdiction: {jurisdiction}")
+
+
+def holidays_for(jurisdiction: str) -> Callable[[int], List[date]]:
+    """Returns a year -> observed holidays function for a jurisdiction."""
+    rules = rules_for(jurisdiction)
+    return lambda year: [rule.date_for(year) for rule in rules]
+
+
+def rules_fingerprint(jurisdiction: str) -> bytes:
+    """Returns a digest of a jurisdiction's rule set.
+
+    Compiled calendar files carry it in their header, so a file compiled
+    before a rule edit is recognised as stale.
+    """
+    rules = repr(rules_for(jurisdiction)).encode()
+    return hashlib.blake2b(rules, digest_size=16).digest()
+
+
+def compile_calendars(jurisdictions: List[str], first_year: int = COMPILE_FIRST_YEAR,
+                      last_year: int = COMPILE_LAST_YEAR, directory: Optional[str] = None) -> List[str]:
+    """Writes one compiled calendar file per jurisdiction; returns their paths."""
+    from timeline_core import CALENDAR_DIR, write_calendar_file
+    directory = directory or CALENDAR_DIR
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for jurisdiction in jurisdictions:
+        path = os.path.join(directory, f"{jurisdiction}.bdcal")
+        write_calendar_file(path, holidays_for(jurisdiction), first_year, last_year,
+                            rules_fingerprint(jurisdiction))
+        paths.append(path)
+    return paths
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Compile holiday rules into business-day calendar files.")
+    parser.add_argument("jurisdictions", nargs="*", default=sorted(JURISDICTIONS),
+                        help="jurisdictions to compile (default: all)")
+    parser.add_argument("--first-year", type=int, default=COMPILE_FIRST_YEAR)
+    parser.add_argument("--last-year", type=int, default=COMPILE_LAST_YEAR)
+    parser.add_argument("--output-dir", help="default: timeline_core.CALENDAR_DIR")
+    args = parser.parse_args(argv)
+    for path in compile_calendars(args.jurisdictions, args.first_year, args.last_year, args.output_dir):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
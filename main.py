@@ -1,15 +1,42 @@
 # Backend (main.py)
-from fastapi import FastAPI
+import json
+import os
+import uuid
+from collections import OrderedDict
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
 from datetime import date
 from enum import Enum
-from typing import Optional
+from time import perf_counter
+from typing import AsyncIterator, Dict, List, Optional
+
+import timeline_core
+from batch import BATCH_SIZE, BatchTimelineCalculator
+from timeline_metrics import SamplingProfiler, registry
+
+# Longest NDJSON line accepted by the bulk endpoint, in bytes
+MAX_BULK_LINE_BYTES = 1 << 20
+# Widest closing-date window the what-if sweep accepts, in days
+MAX_SWEEP_DAYS = 366
+# Requests carrying this header are profiled when TIMELINE_PROFILING=1
+PROFILE_HEADER = b"x-profile"
+PROFILING_ENABLED = os.environ.get("TIMELINE_PROFILING") == "1"
+# Finished profiles kept for /debug/profiles, oldest dropped first
+MAX_STORED_PROFILES = 32
+
+REQUEST_SECONDS = registry.histogram(
+    "timeline_http_request_seconds", "Request latency through the last body chunk sent",
+    labelnames=("method", "route", "status"))
+_bulk_size = BATCH_SIZE.labels("bulk_ndjson")
+_profiles: "OrderedDict[str, str]" = OrderedDict()
 
 class TimingType(str, Enum):
     FIXED_DATE = "fixed_date"
     DAYS_FROM_MUTUAL = "days_from_mutual"
     DAYS_BEFORE_CLOSING = "days_before_closing"
+    DAYS_AFTER_CONTINGENCY = "days_after_contingency"
 
 class Contingency(BaseModel):
     name: str
@@ -18,6 +45,147 @@ class Contingency(BaseModel):
     fixed_date: Optional[date] = None
     description: Optional[str] = None
     is_possession_date: bool = False
+    anchor: Optional[str] = None
+
+class TimelineRequest(BaseModel):
+    id: Optional[str] = None
+    mutual_date: date
+    closing_date: date
+    jurisdiction: str = timeline_core.DEFAULT_JURISDICTION
+    contingencies: List[Contingency] = []
+
+class TimelineEvent(BaseModel):
+    name: str
+    date: date
+    days_from_mutual: int
+    calculation_method: str
+
+class TimelineResponse(BaseModel):
+    id: Optional[str] = None
+    mutual_date: date
+    closing_date: date
+    events: List[TimelineEvent]
+
+class TimelineError(BaseModel):
+    id: Optional[str] = None
+    line: int
+    error: str
+
+class ClosingSweepRequest(BaseModel):
+    mutual_date: date
+    first_closing_date: Optional[date] = None
+    days: int = 90
+    jurisdiction: str = timeline_core.DEFAULT_JURISDICTION
+    contingencies: List[Contingency] = []
+
+class ClosingCandidate(BaseModel):
+    closing_date: date
+    closing_is_business_day: bool
+    deadlines: Dict[str, Optional[date]]
+    on_non_business_day: List[str]
+    before_non_business_day: List[str]
+    business_days: Dict[str, int]
+
+class ClosingSweepResponse(BaseModel):
+    mutual_date: date
+    candidates: List[ClosingCandidate]
+
+class DaysSolveRequest(BaseModel):
+    mutual_date: date
+    closing_date: date
+    earliest: date
+    latest: date
+    is_possession_date: bool = False
+    jurisdiction: str = timeline_core.DEFAULT_JURISDICTION
+
+class DaysSolution(BaseModel):
+    timing_type: TimingType
+    min_days: Optional[int] = None
+    max_days: Optional[int] = None
+    ranges: List[List[int]]
+
+def _core_contingencies(items: List[Contingency]) -> List[timeline_core.Contingency]:
+    """Converts request contingencies to core ones; raises ValueError on bad input."""
+    contingencies = []
+    for item in items:
+        contingency = timeline_core.Contingency(
+            name=item.name,
+            timing_type=timeline_core.TimingType(item.timing_type.value),
+            days=item.days,
+            fixed_date=item.fixed_date,
+            description=item.description,
+            is_possession_date=item.is_possession_date,
+            anchor=item.anchor
+        )
+        if not contingency.is_valid():
+            raise ValueError(f"Invalid contingency configuration: {item.name}")
+        contingencies.append(contingency)
+    return contingencies
+
+def build_timeline(request: TimelineRequest) -> TimelineResponse:
+    """Calculates a timeline with the core calculator; raises ValueError on bad input."""
+    contingencies = _core_contingencies(request.contingencies)
+    dates = timeline_core.resolve_dates(request.mutual_date, request.closing_date, contingencies,
+                                        jurisdiction=request.jurisdiction)
+    events = []
+    for contingency, calculated_date in zip(contingencies, dates):
+        events.append(TimelineEvent(
+            name=contingency.name,
+            date=calculated_date,
+            days_from_mutual=(calculated_date - request.mutual_date).days,
+            calculation_method=timeline_core.TimelineCalculator.calculation_method(contingency)
+        ))
+    events.sort(key=lambda e: e.days_from_mutual)
+    return TimelineResponse(
+        id=request.id,
+        mutual_date=request.mutual_date,
+        closing_date=request.closing_date,
+        events=events
+    )
+
+class _InstrumentationMiddleware:
+    """Times every request and, on request, samples its stack.
+
+    Plain ASGI rather than BaseHTTPMiddleware so the duplex bulk endpoint
+    keeps reading its body while streaming, and so streamed responses are
+    timed through their last chunk. Latency is labelled by route template,
+    not raw path, to keep series bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = perf_counter()
+        status = 500
+        profiler = profile_id = None
+        if PROFILING_ENABLED and dict(scope["headers"]).get(PROFILE_HEADER):
+            profile_id = uuid.uuid4().hex
+            profiler = SamplingProfiler().start()
+
+        async def instrumented_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if profile_id is not None:
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, instrumented_send)
+        finally:
+            route = scope.get("route")
+            REQUEST_SECONDS.labels(scope["method"], route.path if route else "unmatched",
+                                   status).observe(perf_counter() - started)
+            if profiler is not None:
+                _profiles[profile_id] = profiler.stop().collapsed()
+                while len(_profiles) > MAX_STORED_PROFILES:
+                    _profiles.popitem(last=False)
 
 app = FastAPI()
 
@@ -28,9 +196,115 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Profile-Id"],
 )
+app.add_middleware(_InstrumentationMiddleware)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Prometheus text exposition of the service and calculation core metrics."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/debug/profiles/{profile_id}", response_class=PlainTextResponse)
+async def profile(profile_id: str) -> PlainTextResponse:
+    """Collapsed stacks sampled for a request sent with an X-Profile header."""
+    if profile_id not in _profiles:
+        raise HTTPException(status_code=404, detail="Unknown profile")
+    return PlainTextResponse(_profiles[profile_id])
+
+@app.post("/calculate-timeline", response_model=TimelineResponse)
+async def calculate_timeline(data: TimelineRequest) -> TimelineResponse:
+    try:
+        return build_timeline(data)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@app.post("/solve-days", response_model=List[DaysSolution])
+async def solve_days(data: DaysSolveRequest) -> List[DaysSolution]:
+    """Inverse of calculate-timeline: the day counts that land a deadline in [earliest, latest]."""
+    try:
+        calculator = timeline_core.TimelineCalculator(data.mutual_date, data.closing_date,
+                                                      jurisdiction=data.jurisdiction)
+        solutions = calculator.solve_days_all(data.earliest, data.latest, data.is_possession_date)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return [DaysSolution(timing_type=TimingType(s.timing_type.value), min_days=s.min_days,
+                         max_days=s.max_days, ranges=[list(r) for r in s.ranges])
+            for s in solutions.values()]
+
+def build_closing_sweep(request: ClosingSweepRequest) -> ClosingSweepResponse:
+    """Evaluates every candidate closing date in one batched pass; raises ValueError on bad input."""
+    if not 1 <= request.days <= MAX_SWEEP_DAYS:
+        raise ValueError(f"days must be between 1 and {MAX_SWEEP_DAYS}")
+    calculator = BatchTimelineCalculator(timeline_core.calendar_for(request.jurisdiction))
+    sweep = calculator.sweep_closing_dates(request.mutual_date,
+                                           _core_contingencies(request.contingencies),
+                                           request.first_closing_date, request.days)
+    return ClosingSweepResponse(mutual_date=request.mutual_date,
+                                candidates=[ClosingCandidate(**row) for row in sweep.rows()])
+
+@app.post("/closing-date-sweep", response_model=ClosingSweepResponse)
+async def closing_date_sweep(data: ClosingSweepRequest) -> ClosingSweepResponse:
+    """What-if: deadline collisions with weekends and holidays for each candidate closing date."""
+    try:
+        return build_closing_sweep(data)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+async def _ndjson_lines(request: Request) -> AsyncIterator[bytes]:
+    """Yields complete lines from the request body as they arrive."""
+    buffer = b""
+    async for chunk in request.stream():
+        lines = (buffer + chunk).split(b"\n")
+        buffer = lines.pop()
+        for line in lines:
+            yield line
+        if len(buffer) > MAX_BULK_LINE_BYTES:
+            raise ValueError(f"NDJSON line exceeds {MAX_BULK_LINE_BYTES} bytes")
+    if buffer:
+        yield buffer
+
+async def _bulk_results(request: Request) -> AsyncIterator[str]:
+    """Computes one result line per input line, reading input only as output is consumed."""
+    line_number = 0
+    try:
+        async for raw in _ndjson_lines(request):
+            line_number += 1
+            if not raw.strip():
+                continue
+            try:
+                payload = json.loads(raw)
+            except ValueError as e:
+                yield TimelineError(line=line_number, error=f"Invalid JSON: {e}").model_dump_json() + "\n"
+                continue
+            request_id = payload.get("id") if isinstance(payload, dict) else None
+            try:
+                result = build_timeline(TimelineRequest.model_validate(payload))
+            except (ValidationError, ValueError) as e:
+                yield TimelineError(id=request_id, line=line_number, error=str(e)).model_dump_json() + "\n"
+                continue
+            yield result.model_dump_json() + "\n"
+    except ValueError as e:
+        yield TimelineError(line=line_number + 1, error=str(e)).model_dump_json() + "\n"
+    finally:
+        _bulk_size.observe(line_number)
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """StreamingResponse that leaves `receive` to the request body reader.
+
+    The stock response listens for disconnects on `receive` while streaming,
+    which would swallow body chunks the generator has not read yet. Here a
+    disconnect surfaces through request.stream() instead.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+
+@app.post("/calculate-timelines/bulk")
+async def calculate_timelines_bulk(request: Request) -> StreamingResponse:
+    """Streams NDJSON timelines back as each NDJSON transaction is read.
 
-@app.post("/calculate-timeline")
-async def calculate_timeline(data: dict):
-    # Will implement calculation logic here
-    return {"message": "Timeline calculation endpoint"}
\ No newline at end of file
+    The body is consumed only as fast as results are sent, so memory stays
+    bounded by one line and a slow client throttles the upload.
+    """
+    return _DuplexStreamingResponse(_bulk_results(request), media_type="application/x-ndjson")
@@ -0,0 +1,84 @@
+/*
+    Contingency deadlines for every deal at once, following
+    TimelineCalculator.calculate_date:
+
+    - fixed_date items use their fixed date
+    - counts of 5 days or fewer are business days unless the item is a
+      possession date; everything else is calendar days
+    - days_from_mutual counts forward from mutual acceptance,
+      days_before_closing backward from closing
+
+    A business-day offset is an equality join on the calendar's running
+    business_day_number: n business days after base lands on number
+    number(base) + n, and n before lands on number(base) - is_business_day(base) - n + 1,
+    so the base date itself is never counted. Rows that calculate_date
+    rejects, and anchored (days_after_contingency) items, get a null deadline.
+*/
+
+with contingencies as (
+
+    select
+        *,
+        timing_type = 'days_from_mutual' as is_forward,
+        case when timing_type = 'days_from_mutual' then mutual_date else closing_date end as base_date,
+        case
+            when timing_type = 'fixed_date' then 'Fixed Date'
+            when days <= 5 and not is_possession_date then 'Business Days'
+            else 'Calendar Days'
+        end as calculation_method,
+        mutual_date < closing_date
+            and (
+                (timing_type = 'fixed_date' and fixed_date is not null)
+                or (timing_type in ('days_from_mutual', 'days_before_closing') and days > 0)
+            ) as is_valid
+    from {{ ref('stg_transaction_contingencies') }}
+
+),
+
+calendar as (
+
+    select * from {{ ref('business_day_calendar') }}
+
+),
+
+deadlines as (
+
+    select
+        contingencies.*,
+        case
+            when not contingencies.is_valid then null
+            when contingencies.calculation_method = 'Fixed Date' then contingencies.fixed_date
+            when contingencies.calculation_method = 'Business Days' then target.calendar_date
+            when contingencies.is_forward
+                then cast({{ dbt.dateadd('day', 'contingencies.days', 'contingencies.base_date') }} as date)
+            else cast({{ dbt.dateadd('day', '-1 * contingencies.days', 'contingencies.base_date') }} as date)
+        end as deadline_date
+    from contingencies
+    left join calendar as base
+        on contingencies.calculation_method = 'Business Days'
+        and base.jurisdiction = contingencies.jurisdiction
+        and base.calendar_date = contingencies.base_date
+    left join calendar as target
+        on target.jurisdiction = base.jurisdiction
+        and target.is_business_day
+        and target.business_day_number = case
+            when contingencies.is_forward then base.business_day_number + contingencies.days
+            else base.business_day_number - cast(base.is_business_day as integer) - contingencies.days + 1
+        end
+
+)
+
+select
+    deal_id,
+    jurisdiction,
+    mutual_date,
+    closing_date,
+    contingency_name,
+    timing_type,
+    days,
+    fixed_date,
+    is_possession_date,
+    calculation_method,
+    deadline_date,
+    {{ dbt.datediff('mutual_date', 'deadline_date', 'day') }} as days_from_mutual
+from deadlines
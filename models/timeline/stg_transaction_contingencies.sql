@@ -0,0 +1,13 @@
+-- Typed, normalised contingency rows; jurisdiction defaults to WA like the API
+
+select
+    cast(deal_id as varchar) as deal_id,
+    cast(mutual_date as date) as mutual_date,
+    cast(closing_date as date) as closing_date,
+    coalesce(nullif(trim(cast(jurisdiction as varchar)), ''), 'WA') as jurisdiction,
+    contingency_name,
+    lower(timing_type) as timing_type,
+    cast(days as integer) as days,
+    cast(fixed_date as date) as fixed_date,
+    coalesce(cast(is_possession_date as boolean), false) as is_possession_date
+from {{ source('timeline', 'transaction_contingencies') }}
@@ -0,0 +1,197 @@
+import numpy as np
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from batch import TIMING_CODES, BatchTimelineCalculator
+from holiday_rules import JURISDICTIONS
+from timeline_core import DEFAULT_JURISDICTION, Contingency, calendar_for
+
+# date.toordinal() of the NumPy datetime64 epoch, 1970-01-01
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+NO_DAYS = -1
+NO_DATE = 0
+NO_TEXT = -1
+
+TIMING_TYPES = {code: timing_type for timing_type, code in TIMING_CODES.items()}
+# int8 codes used for jurisdictions in the deal columns
+JURISDICTION_NAMES = list(JURISDICTIONS)
+JURISDICTION_CODES = {name: code for code, name in enumerate(JURISDICTION_NAMES)}
+
+
+def _to_datetime64(ordinals: np.ndarray) -> np.ndarray:
+    """Converts date ordinals to datetime64[D]."""
+    return (ordinals.astype(np.int64) - EPOCH_ORDINAL).astype("datetime64[D]")
+
+
+class ContingencyRecord:
+    """Compact single contingency: enum and date stored as small ints."""
+    __slots__ = ("name", "timing_code", "days", "fixed_ordinal", "is_possession_date", "description")
+
+    def __init__(self, name: str, timing_code: int, days: int = NO_DAYS,
+                 fixed_ordinal: int = NO_DATE, is_possession_date: bool = False,
+                 description: Optional[str] = None):
+        self.name = name
+        self.timing_code = timing_code
+        self.days = days
+        self.fixed_ordinal = fixed_ordinal
+        self.is_possession_date = is_possession_date
+        self.description = description
+
+    @classmethod
+    def from_contingency(cls, contingency: Contingency) -> "ContingencyRecord":
+        """Packs a contingency; anchored ones have no column to live in and are rejected."""
+        if contingency.timing_type not in TIMING_CODES or contingency.anchor is not None:
+            raise ValueError(f"Portfolio columns do not support anchored contingencies: {contingency.name}")
+        return cls(
+            name=contingency.name,
+            timing_code=TIMING_CODES[contingency.timing_type],
+            days=NO_DAYS if contingency.days is None else contingency.days,
+            fixed_ordinal=contingency.fixed_date.toordinal() if contingency.fixed_date else NO_DATE,
+            is_possession_date=contingency.is_possession_date,
+            description=contingency.description
+        )
+
+    def to_contingency(self) -> Contingency:
+        return Contingency(
+            name=self.name,
+            timing_type=TIMING_TYPES[self.timing_code],
+            days=None if self.days == NO_DAYS else self.days,
+            fixed_date=date.fromordinal(self.fixed_ordinal) if self.fixed_ordinal != NO_DATE else None,
+            description=self.description,
+            is_possession_date=self.is_possession_date
+        )
+
+
+class PortfolioColumns:
+    """Struct-of-arrays store for many deals and their contingencies.
+
+    Deals are rows of `mutual` and `closing` (int32 date ordinals) and
+    `jurisdiction` (int8 JURISDICTION_CODES). Each deal's contingencies are contiguous, spanning offsets[i]:offsets[i + 1]
+    of the contingency columns: int8 timing codes, int16 days, int32 fixed
+    date ordinals, a bool possession flag and int32 codes into a shared
+    table of interned names and descriptions.
+    """
+
+    def __init__(self, mutual: np.ndarray, closing: np.ndarray, jurisdiction: np.ndarray,
+                 offsets: np.ndarray, timing: np.ndarray, days: np.ndarray, fixed: np.ndarray,
+                 possession: np.ndarray, names: np.ndarray, descriptions: np.ndarray,
+                 strings: List[str]):
+        self.mutual = mutual
+        self.closing = closing
+        self.jurisdiction = jurisdiction
+        self.offsets = offsets
+        self.timing = timing
+        self.days = days
+        self.fixed = fixed
+        self.possession = possession
+        self.names = names
+        self.descriptions = descriptions
+        self.strings = strings
+
+    @classmethod
+    def from_deals(cls, deals: Iterable[tuple]) -> "PortfolioColumns":
+        """Builds columns from (mutual_date, closing_date, contingencies[, jurisdiction]) tuples.
+
+        Deals without a jurisdiction are DEFAULT_JURISDICTION deals.
+        """
+        strings: List[str] = []
+        codes: Dict[str, int] = {}
+
+        def intern(text: Optional[str]) -> int:
+            if text is None:
+                return NO_TEXT
+            if text not in codes:
+                codes[text] = len(strings)
+                strings.append(text)
+            return codes[text]
+
+        mutual, closing, jurisdiction, offsets = [], [], [], [0]
+        timing, days, fixed, possession, names, descriptions = [], [], [], [], [], []
+        for mutual_date, closing_date, contingencies, *rest in deals:
+            deal_jurisdiction = rest[0] if rest else DEFAULT_JURISDICTION
+            if deal_jurisdiction not in JURISDICTION_CODES:
+                raise ValueError(f"Unknown jurisdiction: {deal_jurisdiction}")
+            mutual.append(mutual_date.toordinal())
+            closing.append(closing_date.toordinal())
+            jurisdiction.append(JURISDICTION_CODES[deal_jurisdiction])
+            for contingency in contingencies:
+                record = ContingencyRecord.from_contingency(contingency)
+                timing.append(record.timing_code)
+                days.append(record.days)
+                fixed.append(record.fixed_ordinal)
+                possession.append(record.is_possession_date)
+                names.append(intern(record.name))
+                descriptions.append(intern(record.description))
+            offsets.append(len(timing))
+
+        return cls(
+            mutual=np.array(mutual, dtype=np.int32),
+            closing=np.array(closing, dtype=np.int32),
+            jurisdiction=np.array(jurisdiction, dtype=np.int8),
+            offsets=np.array(offsets, dtype=np.int64),
+            timing=np.array(timing, dtype=np.int8),
+            days=np.array(days, dtype=np.int16),
+            fixed=np.array(fixed, dtype=np.int32),
+            possession=np.array(possession, dtype=np.bool_),
+            names=np.array(names, dtype=np.int32),
+            descriptions=np.array(descriptions, dtype=np.int32),
+            strings=strings
+        )
+
+    def __len__(self) -> int:
+        return len(self.mutual)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the column arrays, excluding the interned strings."""
+        return sum(a.nbytes for a in (self.mutual, self.closing, self.jurisdiction, self.offsets,
+                                      self.timing, self.days, self.fixed, self.possession, self.names,
+                                      self.descriptions))
+
+    def record(self, index: int) -> ContingencyRecord:
+        """Returns the contingency at a flat column index."""
+        description = int(self.descriptions[index])
+        return ContingencyRecord(
+            name=self.strings[self.names[index]],
+            timing_code=int(self.timing[index]),
+            days=int(self.days[index]),
+            fixed_ordinal=int(self.fixed[index]),
+            is_possession_date=bool(self.possession[index]),
+            description=None if description == NO_TEXT else self.strings[description]
+        )
+
+    def deal(self, deal_index: int) -> Tuple[date, date, List[Contingency], str]:
+        """Returns one deal in the same form from_deals accepts, jurisdiction included."""
+        start, end = self.offsets[deal_index], self.offsets[deal_index + 1]
+        return (date.fromordinal(int(self.mutual[deal_index])),
+                date.fromordinal(int(self.closing[deal_index])),
+                [self.record(i).to_contingency() for i in range(start, end)],
+                JURISDICTION_NAMES[self.jurisdiction[deal_index]])
+
+    def calculate_deadlines(self) -> np.ndarray:
+        """Returns a datetime64[D] deadline per contingency, aligned with the columns.
+
+        Rows are calculated in one batch per jurisdiction, each with that
+        jurisdiction's calendar.
+        """
+        deal_of = np.repeat(np.arange(len(self), dtype=np.int32), np.diff(self.offsets))
+        mutual = _to_datetime64(self.mutual[deal_of])
+        closing = _to_datetime64(self.closing[deal_of])
+        days = np.where(self.days == NO_DAYS, np.nan, self.days)
+        fixed = np.where(self.fixed == NO_DATE, np.datetime64("NaT"), _to_datetime64(self.fixed))
+        jurisdiction = self.jurisdiction[deal_of]
+        codes = np.unique(jurisdiction)
+
+        result = np.full(len(self.timing), np.datetime64("NaT"), dtype="datetime64[D]")
+        for code in codes:
+            rows = slice(None) if len(codes) == 1 else jurisdiction == code
+            calculator = BatchTimelineCalculator(calendar_for(JURISDICTION_NAMES[code]))
+            result[rows] = calculator.calculate_dates(
+                mutual_dates=mutual[rows],
+                closing_dates=closing[rows],
+                timing_types=self.timing[rows],
+                days=days[rows],
+                fixed_dates=fixed[rows],
+                is_possession_dates=self.possession[rows]
+            )
+        return result
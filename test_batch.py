@@ -0,0 +1,126 @@
+import random
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from batch import BatchTimelineCalculator
+from timeline_core import Contingency, HolidayUtils, TimelineCalculator, TimingType, resolve_dates
+
+SEED = 20240101
+RELATIVE_TYPES = (TimingType.DAYS_FROM_MUTUAL, TimingType.DAYS_BEFORE_CLOSING)
+
+
+def _holidays(first_year: int, last_year: int):
+    return [h for year in range(first_year, last_year + 1)
+            for h in HolidayUtils.get_wa_state_holidays(year) if h.year == year]
+
+
+def _scalar(mutual: date, closing: date, contingency: Contingency) -> date:
+    return TimelineCalculator(mutual, closing, cache=None).calculate_date(contingency)
+
+
+def _assert_matches(deals, contingencies):
+    """Checks calculate_dates against TimelineCalculator for parallel deal/contingency lists."""
+    batch = BatchTimelineCalculator().calculate_dates(
+        [m for m, _ in deals], [c for _, c in deals],
+        [c.timing_type for c in contingencies],
+        [np.nan if c.days is None else c.days for c in contingencies],
+        [c.fixed_date for c in contingencies],
+        [c.is_possession_date for c in contingencies])
+    for (mutual, closing), contingency, result in zip(deals, contingencies, batch.astype(object)):
+        assert result == _scalar(mutual, closing, contingency), (mutual, closing, contingency)
+
+
+def test_random_contingencies_match_scalar():
+    rng = random.Random(SEED)
+    deals, contingencies = [], []
+    for i in range(3000):
+        mutual = date(2020, 1, 1) + timedelta(days=rng.randrange(365 * 8))
+        closing = mutual + timedelta(days=rng.randint(10, 90))
+        timing_type = rng.choice(list(RELATIVE_TYPES) + [TimingType.FIXED_DATE])
+        if timing_type == TimingType.FIXED_DATE:
+            contingency = Contingency(f"c{i}", timing_type,
+                                      fixed_date=mutual + timedelta(days=rng.randint(1, 9)))
+        else:
+            contingency = Contingency(f"c{i}", timing_type, days=rng.randint(1, 30),
+                                      is_possession_date=rng.random() < 0.25)
+        deals.append((mutual, closing))
+        contingencies.append(contingency)
+    _assert_matches(deals, contingencies)
+
+
+@pytest.mark.parametrize("timing_type", RELATIVE_TYPES)
+@pytest.mark.parametrize("is_possession_date", [False, True])
+def test_weekend_and_holiday_base_dates_match_scalar(timing_type, is_possession_date):
+    rng = random.Random(SEED)
+    holidays = _holidays(2020, 2030)
+    weekends = [d for d in (date(2020, 1, 1) + timedelta(days=n) for n in range(365 * 10))
+                if d.weekday() >= 5]
+    deals, contingencies = [], []
+    for base in rng.sample(holidays, 60) + rng.sample(weekends, 60):
+        # The base date is mutual for forward counts and closing for backward ones
+        if timing_type == TimingType.DAYS_FROM_MUTUAL:
+            mutual, closing = base, base + timedelta(days=45)
+        else:
+            mutual, closing = base - timedelta(days=45), base
+        for days in range(1, 9):
+            deals.append((mutual, closing))
+            contingencies.append(Contingency("c", timing_type, days=days,
+                                             is_possession_date=is_possession_date))
+    _assert_matches(deals, contingencies)
+
+
+def test_portfolio_matches_scalar():
+    rng = random.Random(SEED)
+    mutual_dates = [date(2022, 1, 1) + timedelta(days=rng.randrange(1500)) for _ in range(200)]
+    closing_dates = [m + timedelta(days=rng.randint(21, 60)) for m in mutual_dates]
+    contingencies = [
+        Contingency("Earnest Money", TimingType.DAYS_FROM_MUTUAL, days=2),
+        Contingency("Inspection", TimingType.DAYS_FROM_MUTUAL, days=10),
+        Contingency("Appraisal", TimingType.DAYS_BEFORE_CLOSING, days=5),
+        Contingency("Possession", TimingType.DAYS_BEFORE_CLOSING, days=3, is_possession_date=True),
+    ]
+    result = BatchTimelineCalculator().calculate_portfolio(mutual_dates, closing_dates, contingencies)
+    for row, mutual, closing in zip(result.astype(object), mutual_dates, closing_dates):
+        assert list(row) == [_scalar(mutual, closing, c) for c in contingencies]
+
+
+def test_invalid_entries_are_nat():
+    result = BatchTimelineCalculator().calculate_dates(
+        [date(2024, 3, 1), date(2024, 3, 1), date(2024, 4, 1)],
+        [date(2024, 4, 1), date(2024, 4, 1), date(2024, 3, 1)],
+        [TimingType.DAYS_FROM_MUTUAL, TimingType.FIXED_DATE, TimingType.DAYS_FROM_MUTUAL],
+        [0, np.nan, 3])
+    assert np.isnat(result).all()
+
+
+def test_sweep_without_contingencies_lists_candidates():
+    sweep = BatchTimelineCalculator().sweep_closing_dates(date(2024, 3, 1), [], days=3)
+    rows = sweep.rows()
+    assert [r["closing_date"] for r in rows] == [date(2024, 3, 2), date(2024, 3, 3), date(2024, 3, 4)]
+    assert all(r["deadlines"] == {} and r["business_days"] == {} for r in rows)
+
+
+def test_sweep_resolves_anchored_contingencies():
+    mutual = date(2024, 3, 1)
+    contingencies = [
+        Contingency("Inspection", TimingType.DAYS_FROM_MUTUAL, days=10),
+        Contingency("Response", TimingType.DAYS_AFTER_CONTINGENCY, days=3, anchor="Inspection"),
+        Contingency("Repairs", TimingType.DAYS_AFTER_CONTINGENCY, days=10, anchor="Response"),
+        Contingency("Appraisal", TimingType.DAYS_BEFORE_CLOSING, days=5),
+        Contingency("Financing", TimingType.DAYS_AFTER_CONTINGENCY, days=2, anchor="Appraisal"),
+    ]
+    sweep = BatchTimelineCalculator().sweep_closing_dates(mutual, contingencies, days=60)
+    for row in sweep.rows():
+        expected = resolve_dates(mutual, row["closing_date"], contingencies)
+        assert [row["deadlines"][c.name] for c in contingencies] == expected, row["closing_date"]
+    # Business-day windows for anchored items count from the anchor's deadline
+    assert sweep.rows()[30]["business_days"]["Response"] == 3
+
+
+def test_sweep_rejects_anchor_cycles():
+    contingencies = [Contingency("A", TimingType.DAYS_AFTER_CONTINGENCY, days=1, anchor="B"),
+                     Contingency("B", TimingType.DAYS_AFTER_CONTINGENCY, days=1, anchor="A")]
+    with pytest.raises(ValueError, match="cycle"):
+        BatchTimelineCalculator().sweep_closing_dates(date(2024, 3, 1), contingencies)
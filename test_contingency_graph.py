@@ -0,0 +1,129 @@
+from datetime import date, timedelta
+
+import pytest
+
+from timeline_core import (Contingency, ContingencyGraph, TimelineCalculator, TimingType,
+                           resolve_dates)
+
+MUTUAL = date(2024, 3, 1)
+CLOSING = date(2024, 4, 15)
+
+
+def _anchored(name: str, days: int, anchor: str) -> Contingency:
+    return Contingency(name, TimingType.DAYS_AFTER_CONTINGENCY, days=days, anchor=anchor)
+
+
+def _graph(*contingencies: Contingency) -> ContingencyGraph:
+    graph = ContingencyGraph(MUTUAL, CLOSING)
+    graph.sync(contingencies)
+    return graph
+
+
+CHAIN = [
+    Contingency("Inspection", TimingType.DAYS_FROM_MUTUAL, days=10),
+    _anchored("Response", 3, "Inspection"),
+    _anchored("Repairs", 14, "Response"),
+    Contingency("Appraisal", TimingType.DAYS_BEFORE_CLOSING, days=7),
+]
+
+
+def test_anchored_dates_chain_through_calculate_date():
+    dates = _graph(*CHAIN).evaluate()
+    calculator = TimelineCalculator(MUTUAL, CLOSING, cache=None)
+    inspection = calculator.calculate_date(CHAIN[0])
+    response = calculator.calculate_date(CHAIN[1], inspection)
+    assert dates["Inspection"] == inspection
+    assert dates["Response"] == response
+    assert dates["Repairs"] == calculator.calculate_date(CHAIN[2], response)
+    assert dates["Appraisal"] == calculator.calculate_date(CHAIN[3])
+
+
+def test_first_evaluation_recomputes_everything_in_topological_order():
+    graph = _graph(*CHAIN)
+    graph.evaluate()
+    order = graph.last_recomputed
+    assert sorted(order) == sorted(c.name for c in CHAIN)
+    assert order.index("Inspection") < order.index("Response") < order.index("Repairs")
+
+
+def test_change_recomputes_only_downstream():
+    graph = _graph(*CHAIN)
+    graph.evaluate()
+
+    graph.set(Contingency("Inspection", TimingType.DAYS_FROM_MUTUAL, days=12))
+    dates = graph.evaluate()
+    assert graph.last_recomputed == ["Inspection", "Response", "Repairs"]
+    assert dates["Inspection"] == MUTUAL + timedelta(days=12)
+
+    graph.set(_anchored("Repairs", 10, "Response"))
+    graph.evaluate()
+    assert graph.last_recomputed == ["Repairs"]
+
+
+def test_unchanged_inputs_recompute_nothing():
+    graph = _graph(*CHAIN)
+    graph.evaluate()
+    graph.sync(list(CHAIN))
+    graph.evaluate()
+    assert graph.last_recomputed == []
+
+
+def test_date_change_recomputes_everything():
+    graph = _graph(*CHAIN)
+    graph.evaluate()
+    graph.set_dates(MUTUAL + timedelta(days=1), CLOSING)
+    graph.evaluate()
+    assert sorted(graph.last_recomputed) == sorted(c.name for c in CHAIN)
+
+
+def test_removing_an_anchor_recomputes_dependents():
+    graph = _graph(Contingency("Inspection", TimingType.DAYS_FROM_MUTUAL, days=10),
+                   _anchored("Response", 3, "Inspection"),
+                   Contingency("Appraisal", TimingType.DAYS_BEFORE_CLOSING, days=7))
+    graph.evaluate()
+    graph.sync([Contingency("Inspection", TimingType.DAYS_FROM_MUTUAL, days=10),
+                Contingency("Response", TimingType.DAYS_FROM_MUTUAL, days=3)])
+    dates = graph.evaluate()
+    assert graph.last_recomputed == ["Response"]
+    assert set(dates) == {"Inspection", "Response"}
+
+
+def test_cycle_is_reported_with_its_path():
+    graph = _graph(Contingency("Inspection", TimingType.DAYS_FROM_MUTUAL, days=10),
+                   _anchored("A", 2, "C"), _anchored("B", 2, "A"), _anchored("C", 2, "B"))
+    with pytest.raises(ValueError, match="cycle") as error:
+        graph.evaluate()
+    path = str(error.value).split(": ", 1)[1].split(" -> ")
+    assert path[0] == path[-1] and set(path) == {"A", "B", "C"}
+
+
+def test_failed_evaluation_keeps_nodes_dirty():
+    graph = _graph(Contingency("Inspection", TimingType.DAYS_FROM_MUTUAL, days=10),
+                   _anchored("A", 2, "B"), _anchored("B", 2, "A"))
+    with pytest.raises(ValueError):
+        graph.evaluate()
+    graph.set(_anchored("B", 2, "Inspection"))
+    dates = graph.evaluate()
+    assert set(graph.last_recomputed) == {"Inspection", "A", "B"}
+    assert dates["A"] is not None
+
+
+def test_self_anchor_is_a_cycle():
+    with pytest.raises(ValueError, match="cycle"):
+        _graph(_anchored("A", 2, "A")).evaluate()
+
+
+def test_unknown_anchor_raises():
+    with pytest.raises(ValueError, match="unknown contingency 'Nope'"):
+        resolve_dates(MUTUAL, CLOSING, [_anchored("X", 2, "Nope")])
+
+
+def test_duplicate_names_raise():
+    with pytest.raises(ValueError, match="unique"):
+        _graph(CHAIN[0], CHAIN[0])
+
+
+def test_invalid_anchor_yields_no_date_downstream():
+    dates = resolve_dates(MUTUAL, CLOSING, [Contingency("Inspection", TimingType.DAYS_FROM_MUTUAL),
+                                            _anchored("Response", 3, "Inspection")])
+    assert dates == [None, None]
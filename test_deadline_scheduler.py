@@ -0,0 +1,138 @@
+import asyncio
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from deadline_scheduler import DEFAULT_TIMEZONE, DeadlineScheduler
+from timeline_core import Contingency, TimingType
+
+MUTUAL, CLOSING = date(2024, 3, 1), date(2024, 4, 1)
+INSPECTION = [Contingency("I", TimingType.DAYS_FROM_MUTUAL, days=10)]  # due Mon 3/11 9:00 PM
+
+
+class Clock:
+    def __init__(self, now: datetime):
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock(datetime(2024, 3, 10, 12, 0, tzinfo=DEFAULT_TIMEZONE))
+
+
+@pytest.fixture
+def fired():
+    return []
+
+
+@pytest.fixture
+def scheduler(clock, fired):
+    return DeadlineScheduler(lambda alert: fired.append((alert.contingency_name, alert.lead_time)),
+                             now=clock)
+
+
+@pytest.fixture
+def fire_due():
+    """Runs a scheduler until every alert due at the injected time has fired.
+
+    All runs in a test share one loop, since the scheduler's wakeup event
+    binds to the first loop that waits on it.
+    """
+    loop = asyncio.new_event_loop()
+
+    def fire(scheduler: DeadlineScheduler):
+        async def run():
+            task = asyncio.create_task(scheduler.run())
+            for _ in range(20):
+                await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        loop.run_until_complete(run())
+
+    yield fire
+    loop.close()
+
+
+def test_late_alert_fires_immediately(scheduler, fired, fire_due):
+    scheduler.update_deal("d1", MUTUAL, CLOSING, INSPECTION)
+    fire_due(scheduler)
+    assert fired == [("I", timedelta(hours=48))]
+    assert [a.lead_time for a in scheduler.pending()] == [timedelta(0)]
+
+
+def test_resync_does_not_refire(scheduler, fired, fire_due):
+    scheduler.update_deal("d1", MUTUAL, CLOSING, INSPECTION)
+    fire_due(scheduler)
+    scheduler.update_deal("d1", MUTUAL, CLOSING, INSPECTION)
+    fire_due(scheduler)
+    assert fired == [("I", timedelta(hours=48))]
+
+
+def test_edit_that_keeps_the_deadline_does_not_refire(scheduler, fired, fire_due):
+    scheduler.update_deal("d1", MUTUAL, CLOSING, INSPECTION)
+    fire_due(scheduler)
+    edited = INSPECTION + [Contingency("A", TimingType.DAYS_BEFORE_CLOSING, days=5)]
+    scheduler.update_deal("d1", MUTUAL, CLOSING, edited)
+    fire_due(scheduler)
+    assert fired == [("I", timedelta(hours=48))]
+    assert [(a.contingency_name, a.lead_time) for a in scheduler.pending()] == [
+        ("I", timedelta(0)), ("A", timedelta(hours=48)), ("A", timedelta(0))]
+
+
+def test_moved_deadline_alerts_again(scheduler, fired, fire_due):
+    scheduler.update_deal("d1", MUTUAL, CLOSING, INSPECTION)
+    fire_due(scheduler)
+    # Moved up to day 9, Sun 3/10 at 9:00 PM: its 48h alert is late again
+    scheduler.update_deal("d1", MUTUAL, CLOSING, [Contingency("I", TimingType.DAYS_FROM_MUTUAL, days=9)])
+    fire_due(scheduler)
+    assert fired == [("I", timedelta(hours=48))] * 2
+
+
+def test_removed_deal_starts_over(scheduler, fired, fire_due):
+    scheduler.update_deal("d1", MUTUAL, CLOSING, INSPECTION)
+    fire_due(scheduler)
+    scheduler.remove_deal("d1")
+    assert scheduler.pending() == []
+    scheduler.update_deal("d1", MUTUAL, CLOSING, INSPECTION)
+    fire_due(scheduler)
+    assert fired == [("I", timedelta(hours=48))] * 2
+
+
+def test_alerts_fire_in_order_as_time_passes(scheduler, fired, clock, fire_due):
+    clock.now = datetime(2024, 3, 1, 9, 0, tzinfo=DEFAULT_TIMEZONE)
+    scheduler.update_deal("d1", MUTUAL, CLOSING, INSPECTION)
+    fire_due(scheduler)
+    assert fired == []
+    clock.now = datetime(2024, 3, 9, 21, 0, tzinfo=DEFAULT_TIMEZONE)
+    fire_due(scheduler)
+    clock.now = datetime(2024, 3, 11, 21, 0, tzinfo=DEFAULT_TIMEZONE)
+    fire_due(scheduler)
+    assert fired == [("I", timedelta(hours=48)), ("I", timedelta(0))]
+    scheduler.update_deal("d1", MUTUAL, CLOSING, INSPECTION)
+    fire_due(scheduler)
+    assert len(fired) == 2
+
+
+def test_failing_callback_does_not_stop_other_alerts(clock, fire_due):
+    fired = []
+
+    def callback(alert):
+        fired.append(alert.deal_id)
+        if alert.deal_id == "d1":
+            raise RuntimeError("notification service down")
+
+    scheduler = DeadlineScheduler(callback, now=clock)
+    scheduler.update_deal("d1", MUTUAL, CLOSING, INSPECTION)
+    scheduler.update_deal("d2", MUTUAL, CLOSING, INSPECTION)
+    fire_due(scheduler)
+    assert fired == ["d1", "d2"]
+
+
+def test_past_deadlines_are_dropped(scheduler, clock):
+    clock.now = datetime(2024, 3, 12, 9, 0, tzinfo=DEFAULT_TIMEZONE)
+    scheduler.update_deal("d1", MUTUAL, CLOSING, INSPECTION)
+    assert scheduler.pending() == []
@@ -0,0 +1,72 @@
+import sqlite3
+from datetime import date
+
+import pytest
+
+from deal_store import DEFAULT_STATUS, DealStore
+from timeline_core import Contingency, TimingType
+
+MUTUAL, CLOSING = date(2024, 3, 1), date(2024, 4, 1)
+TODAY = date(2024, 3, 1)
+CONTINGENCIES = [
+    Contingency("Inspection", TimingType.DAYS_FROM_MUTUAL, days=10),
+    Contingency("Appraisal", TimingType.DAYS_FROM_MUTUAL, days=15),
+]
+
+
+@pytest.fixture
+def store():
+    store = DealStore(":memory:")
+    yield store
+    store.close()
+
+
+def _due(store):
+    return [(d.deal_id, d.contingency_name, d.status) for d in store.due_within(60, today=TODAY)]
+
+
+def test_archiving_hides_deadlines_and_restoring_keeps_statuses(store):
+    store.save_deal("d1", MUTUAL, CLOSING, CONTINGENCIES, statuses=["completed", "in_progress"])
+    store.archive_deal("d1")
+    assert _due(store) == []
+    store.archive_deal("d1", archived=False)
+    assert _due(store) == [("d1", "Appraisal", "in_progress")]
+
+
+def test_status_edits_on_archived_deal_stay_hidden(store):
+    store.save_deal("d1", MUTUAL, CLOSING, CONTINGENCIES)
+    store.archive_deal("d1")
+    store.set_status("d1", 0, "in_progress")
+    store.save_deal("d1", MUTUAL, CLOSING, CONTINGENCIES, statuses=["pending", "pending"])
+    assert _due(store) == []
+    store.archive_deal("d1", archived=False)
+    assert _due(store) == [("d1", "Inspection", "pending"), ("d1", "Appraisal", "pending")]
+
+
+def test_recalculation_keeps_archived_flag_and_statuses(store):
+    store.save_deal("d1", MUTUAL, CLOSING, CONTINGENCIES, statuses=["waived", DEFAULT_STATUS])
+    store.archive_deal("d1")
+    assert store.save_deal("d1", MUTUAL, date(2024, 4, 5), CONTINGENCIES)
+    assert _due(store) == []
+    store.archive_deal("d1", archived=False)
+    assert _due(store) == [("d1", "Appraisal", DEFAULT_STATUS)]
+
+
+def test_description_edit_without_recalculation(store):
+    store.save_deal("d1", MUTUAL, CLOSING, CONTINGENCIES)
+    edited = [Contingency("Inspection", TimingType.DAYS_FROM_MUTUAL, days=10, description="Whole house"),
+              CONTINGENCIES[1]]
+    assert not store.save_deal("d1", MUTUAL, CLOSING, edited)
+    assert store.load_contingencies("d1")[0].description == "Whole house"
+
+
+def test_legacy_archived_statuses_are_reset(tmp_path):
+    path = str(tmp_path / "deals.db")
+    DealStore(path).save_deal("d1", MUTUAL, CLOSING, CONTINGENCIES)
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("UPDATE contingencies SET status = 'archived'")
+    conn.close()
+    store = DealStore(path)
+    assert [d.status for d in store.due_within(60, today=TODAY)] == [DEFAULT_STATUS, DEFAULT_STATUS]
+    store.close()
@@ -0,0 +1,50 @@
+import dataclasses
+from datetime import date
+
+import pytest
+
+import holiday_rules
+from timeline_core import BusinessDayCalendar, HolidayUtils, business_calendar, calendar_for
+
+
+def _load(path, jurisdiction, fingerprint_of=None):
+    return BusinessDayCalendar(holiday_rules.holidays_for(jurisdiction), name=jurisdiction, path=path,
+                               fingerprint=holiday_rules.rules_fingerprint(fingerprint_of or jurisdiction))
+
+
+def test_default_calendar_follows_wa_rules():
+    wa = holiday_rules.holidays_for("WA")
+    for year in range(2000, 2040):
+        assert HolidayUtils.get_wa_state_holidays(year) == wa(year)
+    assert business_calendar is calendar_for("WA")
+    assert business_calendar.holidays(2024, 2024) == sorted(d for d in wa(2024) if d.year == 2024)
+
+
+def test_compiled_file_is_mapped(tmp_path):
+    path, = holiday_rules.compile_calendars(["ID"], 2020, 2030, directory=str(tmp_path))
+    calendar = _load(path, "ID")
+    assert isinstance(calendar._index[3], memoryview)
+    assert calendar.is_holiday(date(2024, 10, 14))  # Columbus Day
+
+
+def test_file_compiled_from_other_rules_is_ignored(tmp_path):
+    path, = holiday_rules.compile_calendars(["ID"], 2020, 2030, directory=str(tmp_path))
+    with pytest.warns(RuntimeWarning, match="stale"):
+        calendar = _load(path, "WA")
+    assert not isinstance(calendar._index[3], memoryview)
+    assert not calendar.is_holiday(date(2024, 10, 14))
+
+
+def test_rule_edits_change_the_fingerprint(monkeypatch):
+    before = holiday_rules.rules_fingerprint("WA")
+    edited = [dataclasses.replace(rule, observance=holiday_rules.SUNDAY_TO_MONDAY)
+              if rule is holiday_rules.CHRISTMAS else rule for rule in holiday_rules.JURISDICTIONS["WA"]]
+    monkeypatch.setitem(holiday_rules.JURISDICTIONS, "WA", edited)
+    assert holiday_rules.rules_fingerprint("WA") != before
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / "WA.bdcal"
+    path.write_bytes(b"not a calendar" * 10)
+    with pytest.raises(ValueError, match="not a compiled calendar file"):
+        _load(str(path), "WA")
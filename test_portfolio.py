@@ -0,0 +1,60 @@
+from datetime import date
+
+import pytest
+
+from batch import BatchTimelineCalculator
+from portfolio import ContingencyRecord, PortfolioColumns
+from timeline_core import Contingency, TimingType, resolve_dates
+
+CONTINGENCIES = [
+    Contingency("Inspection", TimingType.DAYS_FROM_MUTUAL, days=10, description="Whole house"),
+    Contingency("Possession", TimingType.DAYS_BEFORE_CLOSING, days=3, is_possession_date=True),
+    Contingency("Title", TimingType.FIXED_DATE, fixed_date=date(2024, 3, 20)),
+]
+
+
+@pytest.mark.parametrize("contingency", CONTINGENCIES, ids=lambda c: c.name)
+def test_record_round_trip_is_lossless(contingency):
+    assert ContingencyRecord.from_contingency(contingency).to_contingency() == contingency
+
+
+def test_columns_round_trip_deals():
+    deals = [(date(2024, 3, 1), date(2024, 4, 15), CONTINGENCIES, "WA"),
+             (date(2024, 5, 1), date(2024, 6, 1), CONTINGENCIES[:1], "ID")]
+    columns = PortfolioColumns.from_deals(deals)
+    assert [columns.deal(i) for i in range(len(columns))] == deals
+
+
+def test_deals_default_to_wa():
+    columns = PortfolioColumns.from_deals([(date(2024, 3, 1), date(2024, 4, 15), CONTINGENCIES)])
+    assert columns.deal(0)[3] == "WA"
+
+
+def test_unknown_jurisdiction_is_rejected():
+    with pytest.raises(ValueError, match="Unknown jurisdiction"):
+        PortfolioColumns.from_deals([(date(2024, 3, 1), date(2024, 4, 15), CONTINGENCIES, "XX")])
+
+
+def test_deadlines_use_each_deals_jurisdiction():
+    # Columbus Day, Mon 10/14/2024, is a holiday in ID but not WA or OR
+    contingencies = [Contingency("Earnest Money", TimingType.DAYS_FROM_MUTUAL, days=2),
+                     Contingency("Appraisal", TimingType.DAYS_BEFORE_CLOSING, days=3)]
+    deals = [(date(2024, 10, 10), date(2024, 10, 17), contingencies, jurisdiction)
+             for jurisdiction in ("WA", "ID", "OR", "ID")]
+    columns = PortfolioColumns.from_deals(deals)
+    expected = [resolve_dates(m, c, items, jurisdiction=j) for m, c, items, j in deals]
+    assert columns.calculate_deadlines().astype(object).tolist() == sum(expected, [])
+    assert expected[0] != expected[1]
+
+    result = BatchTimelineCalculator().calculate_portfolio(
+        [d[0] for d in deals], [d[1] for d in deals], contingencies, jurisdictions=[d[3] for d in deals])
+    assert result.astype(object).tolist() == expected
+
+
+@pytest.mark.parametrize("contingency", [
+    Contingency("Response", TimingType.DAYS_AFTER_CONTINGENCY, days=3, anchor="Inspection"),
+    Contingency("Response", TimingType.DAYS_FROM_MUTUAL, days=3, anchor="Inspection"),
+])
+def test_anchored_contingencies_are_rejected(contingency):
+    with pytest.raises(ValueError, match="anchored"):
+        ContingencyRecord.from_contingency(contingency)
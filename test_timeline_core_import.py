@@ -0,0 +1,16 @@
+import statistics
+
+from benchmarks import FORBIDDEN_CORE_IMPORTS, IMPORT_BUDGET_SECONDS, measure_core_import
+
+
+def test_import_stays_within_budget():
+    measurements = [measure_core_import() for _ in range(5)]
+    median = statistics.median(elapsed for elapsed, _ in measurements)
+    assert median <= IMPORT_BUDGET_SECONDS, (
+        f"importing timeline_core took {median * 1e3:.0f}ms, "
+        f"budget is {IMPORT_BUDGET_SECONDS * 1e3:.0f}ms")
+
+
+def test_import_loads_no_forbidden_modules():
+    _, loaded = measure_core_import()
+    assert not loaded, f"importing timeline_core loads {', '.join(loaded)} (forbidden: {FORBIDDEN_CORE_IMPORTS})"
@@ -0,0 +1,6 @@
+-- One calendar row per jurisdiction and day
+
+select jurisdiction, calendar_date, count(*) as row_count
+from {{ ref('business_day_calendar') }}
+group by jurisdiction, calendar_date
+having count(*) > 1
@@ -0,0 +1,44 @@
+/*
+    Business-day deadlines land on a business day exactly `days` business
+    days from their base date (which is never counted); calendar-day
+    deadlines are exactly `days` calendar days away.
+*/
+
+with deadlines as (
+
+    select
+        *,
+        case when timing_type = 'days_from_mutual' then mutual_date else closing_date end as base_date
+    from {{ ref('contingency_deadlines') }}
+    where deadline_date is not null
+      and calculation_method != 'Fixed Date'
+
+),
+
+calendar as (
+
+    select * from {{ ref('business_day_calendar') }}
+
+)
+
+select deadlines.*
+from deadlines
+left join calendar as base
+    on base.jurisdiction = deadlines.jurisdiction and base.calendar_date = deadlines.base_date
+left join calendar as deadline
+    on deadline.jurisdiction = deadlines.jurisdiction and deadline.calendar_date = deadlines.deadline_date
+where (
+    deadlines.calculation_method = 'Business Days'
+    and (
+        not deadline.is_business_day
+        or case
+            when deadlines.timing_type = 'days_from_mutual'
+                then deadline.business_day_number - base.business_day_number
+            else base.business_day_number - cast(base.is_business_day as integer)
+                - deadline.business_day_number + 1
+        end != deadlines.days
+    )
+) or (
+    deadlines.calculation_method = 'Calendar Days'
+    and abs({{ dbt.datediff('deadlines.base_date', 'deadlines.deadline_date', 'day') }}) != deadlines.days
+)
@@ -0,0 +1,215 @@
+"""Bulk timeline generation from CSV or Parquet files.
+
+Each input row holds `mutual_date`, `closing_date` (ISO dates), optional
+`id` and `jurisdiction` (default WA) columns, and one column per
+contingency whose cell is a compact spec:
+
+    days_from_mutual:10
+    days_before_closing:3:possession
+    fixed_date:2025-01-02
+    days_after_contingency:3:inspection
+
+The last form counts from the deadline in another contingency column (the
+anchor), and may also end in `:possession`.
+
+Rows are streamed in chunks, calculated across a process pool, and written
+out incrementally with one deadline column per contingency plus `error`.
+
+    python timeline_cli.py deals.csv deadlines.csv --chunk-size 5000 --workers 8
+"""
+import argparse
+import csv
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from itertools import islice
+from os import cpu_count
+from typing import Dict, Iterator, List, Optional
+
+from timeline_core import DEFAULT_JURISDICTION, Contingency, TimingType, resolve_dates
+
+ID_COLUMN = "id"
+MUTUAL_COLUMN = "mutual_date"
+CLOSING_COLUMN = "closing_date"
+JURISDICTION_COLUMN = "jurisdiction"
+ERROR_COLUMN = "error"
+
+
+def parse_contingency(name: str, spec: str) -> Optional[Contingency]:
+    """Parses a compact contingency spec cell; blank cells mean no contingency."""
+    spec = (spec or "").strip()
+    if not spec:
+        return None
+    parts = spec.split(":")
+    timing_type = TimingType(parts[0])
+    if len(parts) < 2 or not parts[1]:
+        raise ValueError(f"Contingency spec for {name} is missing its value: {spec}")
+    if timing_type == TimingType.FIXED_DATE:
+        return Contingency(name=name, timing_type=timing_type,
+                           fixed_date=date.fromisoformat(parts[1]))
+    anchor = None
+    if timing_type == TimingType.DAYS_AFTER_CONTINGENCY:
+        anchor = parts.pop(2) if len(parts) > 2 else None
+    is_possession = len(parts) > 2 and parts[2] == "possession"
+    return Contingency(name=name, timing_type=timing_type, days=int(parts[1]),
+                       is_possession_date=is_possession, anchor=anchor)
+
+
+def process_chunk(contingency_columns: List[str], rows: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Calculates deadlines for a chunk of rows; runs inside a worker process."""
+    results = []
+    for row in rows:
+        result = {ID_COLUMN: row.get(ID_COLUMN, ""), ERROR_COLUMN: ""}
+        try:
+            contingencies = []
+            for column in contingency_columns:
+                contingency = parse_contingency(column, row.get(column))
+                result[column] = ""
+                if contingency is None:
+                    continue
+                if not contingency.is_valid():
+                    raise ValueError(f"Invalid contingency configuration: {column}")
+                contingencies.append(contingency)
+            dates = resolve_dates(date.fromisoformat(str(row[MUTUAL_COLUMN])),
+                                  date.fromisoformat(str(row[CLOSING_COLUMN])), contingencies,
+                                  jurisdiction=row.get(JURISDICTION_COLUMN) or DEFAULT_JURISDICTION)
+            for contingency, deadline in zip(contingencies, dates):
+                result[contingency.name] = deadline.isoformat()
+        except (KeyError, ValueError) as e:
+            result[ERROR_COLUMN] = str(e)
+        results.append(result)
+    return results
+
+
+def _chunks(rows: Iterator[Dict[str, str]], chunk_size: int) -> Iterator[List[Dict[str, str]]]:
+    """Groups an iterator of rows into lists of at most chunk_size."""
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def read_rows(path: str, chunk_size: int):
+    """Returns (columns, chunk iterator) for a CSV or Parquet file."""
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Reading Parquet requires pyarrow (pip install pyarrow).")
+        parquet = pq.ParquetFile(path)
+        columns = parquet.schema_arrow.names
+        batches = (batch.to_pylist() for batch in parquet.iter_batches(batch_size=chunk_size))
+        return columns, batches
+
+    handle = open(path, newline="")
+    reader = csv.DictReader(handle)
+    return reader.fieldnames or [], _csv_chunks(handle, reader, chunk_size)
+
+
+def _csv_chunks(handle, reader: csv.DictReader, chunk_size: int) -> Iterator[List[Dict[str, str]]]:
+    """Yields CSV chunks and closes the file once they are exhausted."""
+    with handle:
+        yield from _chunks(iter(reader), chunk_size)
+
+
+class RowWriter:
+    """Incrementally writes result rows to CSV or Parquet."""
+
+    def __init__(self, path: str, columns: List[str]):
+        self.columns = columns
+        self._parquet = path.endswith(".parquet")
+        if self._parquet:
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise SystemExit("Writing Parquet requires pyarrow (pip install pyarrow).")
+            self._pa = pa
+            self._writer = pq.ParquetWriter(path, pa.schema([(c, pa.string()) for c in columns]))
+        else:
+            self._handle = open(path, "w", newline="")
+            self._writer = csv.DictWriter(self._handle, fieldnames=columns)
+            self._writer.writeheader()
+
+    def write(self, rows: List[Dict[str, str]]):
+        if self._parquet:
+            self._writer.write_table(self._pa.Table.from_pylist(rows, schema=self._writer.schema))
+        else:
+            self._writer.writerows(rows)
+
+    def close(self):
+        if self._parquet:
+            self._writer.close()
+        else:
+            self._handle.close()
+
+
+def run(input_path: str, output_path: str, chunk_size: int, workers: int,
+        progress=sys.stderr) -> int:
+    """Streams input_path through the calculator into output_path; returns rows processed."""
+    columns, chunks = read_rows(input_path, chunk_size)
+    missing = {MUTUAL_COLUMN, CLOSING_COLUMN} - set(columns)
+    if missing:
+        raise SystemExit(f"Input is missing required columns: {', '.join(sorted(missing))}")
+    contingency_columns = [c for c in columns
+                           if c not in (ID_COLUMN, MUTUAL_COLUMN, CLOSING_COLUMN, JURISDICTION_COLUMN)]
+    writer = RowWriter(output_path, [ID_COLUMN] + contingency_columns + [ERROR_COLUMN])
+
+    started = time.perf_counter()
+    processed = 0
+    # Keep a bounded number of chunks in flight so memory does not grow with the file
+    max_pending = workers * 2
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = []
+            for chunk in chunks:
+                pending.append(executor.submit(process_chunk, contingency_columns, chunk))
+                if len(pending) < max_pending:
+                    continue
+                processed += _drain(pending.pop(0), writer)
+                _report(progress, processed, started)
+            for future in pending:
+                processed += _drain(future, writer)
+                _report(progress, processed, started)
+    finally:
+        writer.close()
+    return processed
+
+
+def _drain(future, writer: RowWriter) -> int:
+    rows = future.result()
+    writer.write(rows)
+    return len(rows)
+
+
+def _report(progress, processed: int, started: float):
+    if progress is None:
+        return
+    elapsed = time.perf_counter() - started
+    rate = processed / elapsed if elapsed else 0.0
+    progress.write(f"\r{processed:,} rows  {rate:,.0f} rows/sec")
+    progress.flush()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Generate contingency deadlines for many transactions.")
+    parser.add_argument("input", help="CSV or .parquet file of transactions")
+    parser.add_argument("output", help="CSV or .parquet file to write deadlines to")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="rows per work unit (default: 5000)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--quiet", action="store_true", help="suppress progress output")
+    args = parser.parse_args(argv)
+
+    workers = args.workers or cpu_count() or 1
+    started = time.perf_counter()
+    processed = run(args.input, args.output, args.chunk_size, workers,
+                    progress=None if args.quiet else sys.stderr)
+    elapsed = time.perf_counter() - started
+    if not args.quiet:
+        sys.stderr.write(f"\nDone: {processed:,} rows in {elapsed:.1f}s\n")
+
+
+if __name__ == "__main__":
+    main()
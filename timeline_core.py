@@ -0,0 +1,947 @@
+import mmap
+import os
+import struct
+import sys
+import warnings
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict, deque
+from datetime import date, timedelta, datetime
+from dataclasses import dataclass
+from threading import Lock
+from time import monotonic, perf_counter
+from typing import Callable, Optional, List, Dict, Iterable, Set, Tuple
+from enum import Enum
+
+import holiday_rules
+from timeline_metrics import DAY_BUCKETS, registry
+
+def format_date(d: date, include_time: bool = True) -> str:
+    """Format date for display with optional time."""
+    if not isinstance(d, (date, datetime)):
+        return "Invalid Date"
+    base_str = d.strftime("%B %d, %Y")
+    return f"{base_str} at 9:00 PM" if include_time else base_str
+
+class TimingType(Enum):
+    """Enumeration of timing methods for contingencies."""
+    FIXED_DATE = "fixed_date"
+    DAYS_FROM_MUTUAL = "days_from_mutual"
+    DAYS_BEFORE_CLOSING = "days_before_closing"
+    DAYS_AFTER_CONTINGENCY = "days_after_contingency"
+
+    @classmethod
+    def friendly_name(cls, timing_type: str) -> str:
+        """Converts enum value to a human-friendly format."""
+        return timing_type.replace('_', ' ').title()
+
+
+
+@dataclass
+class Contingency:
+    """Represents a contingency with its details and constraints."""
+    name: str
+    timing_type: TimingType
+    days: Optional[int] = None
+    fixed_date: Optional[date] = None
+    description: Optional[str] = None
+    is_possession_date: bool = False
+    anchor: Optional[str] = None  # Name of the contingency a DAYS_AFTER_CONTINGENCY item counts from
+
+    def is_valid(self) -> bool:
+        """Validates the contingency configuration."""
+        if self.timing_type == TimingType.FIXED_DATE:
+            return self.fixed_date is not None  # Only need fixed_date for FIXED_DATE type
+        if self.timing_type == TimingType.DAYS_AFTER_CONTINGENCY and not self.anchor:
+            return False
+        return self.days is not None and self.days > 0  # Only need days for other types
+
+
+class HolidayUtils:
+    """Utility class for WA State holiday calculations."""
+
+    @staticmethod
+    def get_wa_state_holidays(year: int) -> List[date]:
+        """Returns WA State holidays for the given year, from holiday_rules' WA rule set."""
+        return _wa_holidays(year)
+
+    @staticmethod
+    def nth_weekday_of_month(year: int, month: int, weekday: int, nth: int) -> date:
+        """Returns the nth occurrence of a weekday in a given month."""
+        return holiday_rules.nth_weekday_of_month(year, month, weekday, nth)
+
+    @staticmethod
+    def last_weekday_of_month(year: int, month: int, weekday: int) -> date:
+        """Returns the last occurrence of a weekday in a given month."""
+        return holiday_rules.last_weekday_of_month(year, month, weekday)
+
+    @staticmethod
+    def adjust_weekend_holiday(holiday: date) -> date:
+        """Adjusts holidays falling on weekends to nearest weekday."""
+        return holiday_rules.nearest_weekday(holiday)
+
+    @staticmethod
+    def is_business_day(day: date) -> bool:
+        """Determines if a date is a business day."""
+        return business_calendar.is_business_day(day)
+
+
+DEFAULT_JURISDICTION = "WA"
+_wa_holidays = holiday_rules.holidays_for(DEFAULT_JURISDICTION)
+
+# Compiled calendar files: magic, then first_year, last_year, base_ordinal, day
+# count and the holiday_rules.rules_fingerprint the file was compiled from,
+# then one flag byte per day, padding to 4 bytes, and one int32 running
+# business-day count per day.
+CALENDAR_MAGIC = b"BDCAL002"
+CALENDAR_HEADER = struct.Struct("<8shhiI16s")
+CALENDAR_DIR = os.environ.get("TIMELINE_CALENDAR_DIR",
+                              os.path.join(os.path.dirname(os.path.abspath(__file__)), "calendars"))
+
+
+# Hot-path metrics, rendered by main.py's /metrics endpoint
+HOLIDAY_GENERATION_SECONDS = registry.histogram(
+    "timeline_holiday_generation_seconds", "Time generating holidays for one calendar build")
+HOLIDAY_YEARS_GENERATED = registry.counter(
+    "timeline_holiday_years_generated_total", "Years of holidays generated for calendar builds")
+CALENDAR_BUILD_SECONDS = registry.histogram(
+    "timeline_calendar_build_seconds", "Time building a business-day calendar index")
+CALCULATE_DATE_SECONDS = registry.histogram(
+    "timeline_calculate_date_seconds", "TimelineCalculator.calculate_date latency, cache hits included",
+    labelnames=("method",))
+DAY_COUNT_SECONDS = registry.histogram(
+    "timeline_day_count_seconds", "DateCalculator business and calendar day count latency",
+    labelnames=("method",))
+DAYS_ITERATED = registry.histogram(
+    "timeline_day_count_days_iterated", "Calendar days between base date and result per day count",
+    DAY_BUCKETS, labelnames=("method",))
+# Series the hot paths record into, bound once so each call skips the label lookup
+# calculate_date series are keyed by TimelineCalculator.calculation_method
+_calculate_date_seconds = {method: CALCULATE_DATE_SECONDS.labels(label)
+                           for method, label in (("Fixed Date", "fixed"), ("Business Days", "business"),
+                                                 ("Calendar Days", "calendar"))}
+_day_count_seconds = {method: DAY_COUNT_SECONDS.labels(method) for method in ("business", "calendar")}
+_days_iterated = {method: DAYS_ITERATED.labels(method) for method in ("business", "calendar")}
+
+
+def _observe_day_count(method: str, started: float, base_date: date, final_date: date):
+    _day_count_seconds[method].observe(perf_counter() - started)
+    _days_iterated[method].observe(abs(final_date.toordinal() - base_date.toordinal()))
+
+
+def calendar_file(jurisdiction: str) -> str:
+    """Returns where the compiled calendar for a jurisdiction lives."""
+    return os.path.join(CALENDAR_DIR, f"{jurisdiction}.bdcal")
+
+
+def _build_index(holidays_for_year: Callable[[int], List[date]], first_year: int, last_year: int) -> tuple:
+    """Builds (first_year, last_year, base_ordinal, flags, prefix) for a year range."""
+    started = perf_counter()
+    base_ordinal = date(first_year, 1, 1).toordinal()
+    end_ordinal = date(last_year, 12, 31).toordinal()
+    holidays = set()
+    for year in range(first_year, last_year + 1):
+        # A holiday shifted into a neighbouring year only counts in the
+        # year it was generated for, matching get_wa_state_holidays lookups.
+        holidays.update(h.toordinal() for h in holidays_for_year(year) if h.year == year)
+    HOLIDAY_GENERATION_SECONDS.observe(perf_counter() - started)
+    HOLIDAY_YEARS_GENERATED.inc(last_year - first_year + 1)
+
+    flags = bytearray(end_ordinal - base_ordinal + 1)
+    prefix = array('i', bytes(4 * len(flags)))
+    count = 0
+    for i in range(len(flags)):
+        ordinal = base_ordinal + i
+        # date.fromordinal(1) is a Monday, so (ordinal - 1) % 7 is the weekday
+        if (ordinal - 1) % 7 < 5 and ordinal not in holidays:
+            flags[i] = 1
+            count += 1
+        prefix[i] = count
+    CALENDAR_BUILD_SECONDS.observe(perf_counter() - started)
+    return first_year, last_year, base_ordinal, flags, prefix
+
+
+def write_calendar_file(path: str, holidays_for_year: Callable[[int], List[date]],
+                        first_year: int, last_year: int, fingerprint: bytes):
+    """Compiles holiday rules into a calendar file BusinessDayCalendar can map."""
+    first_year, last_year, base_ordinal, flags, prefix = _build_index(holidays_for_year, first_year, last_year)
+    if sys.byteorder != "little":
+        prefix.byteswap()
+    padding = -(CALENDAR_HEADER.size + len(flags)) % 4
+    with open(path, "wb") as f:
+        f.write(CALENDAR_HEADER.pack(CALENDAR_MAGIC, first_year, last_year, base_ordinal, len(flags),
+                                     fingerprint))
+        f.write(flags)
+        f.write(bytes(padding))
+        f.write(prefix.tobytes())
+
+
+def _map_calendar_file(path: str, fingerprint: Optional[bytes]) -> Optional[tuple]:
+    """Memory-maps a compiled calendar file as an index tuple.
+
+    The pages are read-only and shared by every process mapping the file.
+    Returns None if the file was compiled by another format version or from
+    rules other than the ones `fingerprint` identifies.
+    """
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapped[:5] != CALENDAR_MAGIC[:5]:
+        raise ValueError(f"{path} is not a compiled calendar file")
+    if mapped[:8] != CALENDAR_MAGIC or CALENDAR_HEADER.unpack_from(mapped)[5] != fingerprint:
+        mapped.close()
+        return None
+    magic, first_year, last_year, base_ordinal, days, _ = CALENDAR_HEADER.unpack_from(mapped)
+    view = memoryview(mapped)
+    start = CALENDAR_HEADER.size
+    flags = view[start:start + days]
+    start += days + (-(start + days) % 4)
+    prefix = view[start:start + 4 * days].cast("i")
+    return first_year, last_year, base_ordinal, flags, prefix
+
+
+class BusinessDayCalendar:
+    """Precomputed business-day index over a range of years.
+
+    Holds one flag per day plus a running count of business days, both keyed
+    by date ordinal, so business-day checks and offsets are lookups instead of
+    day-by-day walks. The index is either built from holiday rules or mapped
+    from a compiled calendar file, and grows lazily in memory when a date
+    outside it is requested. A file is only mapped if its header carries
+    `fingerprint`, the digest of the rules holidays_for_year follows; a
+    stale file is ignored with a warning and the index built from the rules.
+    """
+
+    def __init__(self, holidays_for_year: Callable[[int], List[date]] = HolidayUtils.get_wa_state_holidays,
+                 first_year: Optional[int] = None, last_year: Optional[int] = None,
+                 name: str = DEFAULT_JURISDICTION, path: Optional[str] = None,
+                 fingerprint: Optional[bytes] = None):
+        self.name = name
+        self._holidays_for_year = holidays_for_year
+        self._lock = Lock()
+        self._index = None
+        self.version = 0
+        if path is not None and sys.byteorder == "little":
+            self._index = _map_calendar_file(path, fingerprint)
+            if self._index is None:
+                warnings.warn(f"{path} is stale (another file format or holiday rules) and is ignored; "
+                              f"recompile it with holiday_rules.py", RuntimeWarning, stacklevel=2)
+        if self._index is None:
+            today = date.today()
+            self._build(first_year or today.year - 5, last_year or today.year + 5)
+
+    def _build(self, first_year: int, last_year: int):
+        """Builds the index for the inclusive year range."""
+        self._index = _build_index(self._holidays_for_year, first_year, last_year)
+
+    def _ensure(self, first_year: int, last_year: int):
+        """Returns an index covering the given years, growing it if needed."""
+        index = self._index
+        if index[0] <= first_year and last_year <= index[1]:
+            return index
+        with self._lock:
+            index = self._index
+            if not (index[0] <= first_year and last_year <= index[1]):
+                self._build(min(first_year, index[0]), max(last_year, index[1]))
+            return self._index
+
+    def _position(self, day: date, years_before: int = 0, years_after: int = 0):
+        """Returns the index and the position of a date within it."""
+        index = self._ensure(day.year - years_before, day.year + years_after)
+        return index, day.toordinal() - index[2]
+
+    def set_holiday_rules(self, holidays_for_year: Callable[[int], List[date]]):
+        """Replaces the holiday rules and rebuilds the index over the same years.
+
+        Bumps `version` so cached results keyed on the old version stop matching.
+        """
+        with self._lock:
+            self._holidays_for_year = holidays_for_year
+            self._build(self._index[0], self._index[1])
+            self.version += 1
+
+    @property
+    def year_range(self) -> tuple:
+        """Returns the inclusive (first_year, last_year) currently covered."""
+        return self._index[0], self._index[1]
+
+    def is_business_day(self, day: date) -> bool:
+        """Determines if a date is a business day."""
+        index, pos = self._position(day)
+        return index[3][pos] == 1
+
+    def is_holiday(self, day: date) -> bool:
+        """Determines if a weekday date is a holiday."""
+        return day.weekday() < 5 and not self.is_business_day(day)
+
+    def holidays(self, first_year: int, last_year: int) -> List[date]:
+        """Returns the weekday holidays observed in the inclusive year range."""
+        index = self._ensure(first_year, last_year)
+        start = date(first_year, 1, 1).toordinal() - index[2]
+        end = date(last_year, 12, 31).toordinal() - index[2]
+        flags = index[3]
+        return [date.fromordinal(index[2] + i) for i in range(start, end + 1)
+                if not flags[i] and (index[2] + i - 1) % 7 < 5]
+
+    def business_days_through(self, day: date) -> int:
+        """Returns the running business-day count up to and including a date."""
+        index, pos = self._position(day)
+        return index[4][pos]
+
+    def offset(self, base_date: date, days: int, forward: bool) -> date:
+        """Returns the date `days` business days after or before base_date.
+
+        base_date itself is never counted, matching the day-by-day count in
+        DateCalculator.calculate_business_days.
+        """
+        if days <= 0:
+            return base_date
+        # Business days never run thinner than ~240 a year; pad the covered
+        # range so the answer is found without growing twice.
+        span = days // 240 + 1
+        while True:
+            if forward:
+                index, pos = self._position(base_date, 0, span)
+                prefix = index[4]
+                target = prefix[pos] + days
+            else:
+                index, pos = self._position(base_date, span, 0)
+                prefix = index[4]
+                target = (prefix[pos - 1] if pos > 0 else 0) - days + 1
+            if 1 <= target <= prefix[-1]:
+                return date.fromordinal(index[2] + bisect_left(prefix, target))
+            span *= 2
+
+
+def _load_calendar(jurisdiction: str) -> BusinessDayCalendar:
+    """Builds a jurisdiction's calendar from its rules, mapping its compiled file when present."""
+    path = calendar_file(jurisdiction)
+    return BusinessDayCalendar(holiday_rules.holidays_for(jurisdiction), name=jurisdiction,
+                               path=path if os.path.exists(path) else None,
+                               fingerprint=holiday_rules.rules_fingerprint(jurisdiction))
+
+
+business_calendar = _load_calendar(DEFAULT_JURISDICTION)
+_calendars: Dict[str, BusinessDayCalendar] = {DEFAULT_JURISDICTION: business_calendar}
+_calendars_lock = Lock()
+
+
+def calendar_for(jurisdiction: str) -> BusinessDayCalendar:
+    """Returns the shared calendar for a jurisdiction, loading it on first use."""
+    calendar = _calendars.get(jurisdiction)
+    if calendar is not None:
+        return calendar
+    with _calendars_lock:
+        if jurisdiction not in _calendars:
+            _calendars[jurisdiction] = _load_calendar(jurisdiction)
+        return _calendars[jurisdiction]
+
+
+@dataclass
+class CacheStats:
+    """Snapshot of DeadlineCache counters."""
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class DeadlineCache:
+    """Thread-safe LRU cache of resolved deadlines with an optional TTL.
+
+    TimelineCalculator keys entries on (jurisdiction, calendar version,
+    base_date, days, forward, business_days), so results computed under old
+    holiday rules stop matching as soon as the rules change and age out.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: Optional[float] = None):
+        if maxsize <= 0:
+            raise ValueError("Cache size must be positive.")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key: tuple, compute: Callable[[], date]) -> date:
+        """Returns the cached value for key, computing and storing it on a miss."""
+        now = monotonic() if self.ttl is not None else 0.0
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (self.ttl is None or now - entry[1] < self.ttl):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        value = compute()
+        with self._lock:
+            self._entries[key] = (value, now)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        """Drops all entries and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> CacheStats:
+        """Returns the current counters."""
+        with self._lock:
+            return CacheStats(self.hits, self.misses, self.evictions,
+                              len(self._entries), self.maxsize)
+
+
+deadline_cache = DeadlineCache()
+registry.callback("timeline_deadline_cache_hits_total", "Deadline cache hits",
+                  lambda: deadline_cache.stats().hits, kind="counter")
+registry.callback("timeline_deadline_cache_misses_total", "Deadline cache misses",
+                  lambda: deadline_cache.stats().misses, kind="counter")
+registry.callback("timeline_deadline_cache_evictions_total", "Deadline cache evictions",
+                  lambda: deadline_cache.stats().evictions, kind="counter")
+registry.callback("timeline_deadline_cache_size", "Entries in the deadline cache",
+                  lambda: deadline_cache.stats().size)
+registry.callback("timeline_deadline_cache_hit_ratio", "Deadline cache hits over lookups",
+                  lambda: deadline_cache.stats().hit_rate)
+
+
+class CalculationTrace:
+    """Collects calculation steps as compact tuples for lazy rendering.
+
+    Calculators only record into a trace when one is passed in, so the
+    default path does no per-day work and emits nothing. Each event is a
+    tuple whose first item names its kind; dates are stored as ordinals.
+    """
+
+    def __init__(self):
+        self.events: List[tuple] = []
+
+    def record(self, *event):
+        """Appends one event tuple."""
+        self.events.append(event)
+
+    def lines(self):
+        """Yields a human-readable line per recorded event."""
+        for event in self.events:
+            yield format_trace_event(event)
+
+
+def format_trace_event(event: tuple) -> str:
+    """Formats a single CalculationTrace event for display."""
+    kind = event[0]
+    if kind == "contingency":
+        _, name, timing_type, days = event
+        return (f"\n🔍 Processing: {name}\nType: {timing_type}" +
+                (f"\nDays: {days}" if days is not None else ""))
+    if kind == "fixed":
+        return "Using fixed date"
+    if kind == "start":
+        _, method, base_ordinal, forward, days = event
+        return (f"\n📅 {method} Calculation:\n"
+                f"• Starting from: {date.fromordinal(base_ordinal)}\n"
+                f"• Direction: {'Forward' if forward else 'Backward'}\n"
+                f"• Days to count: {days}\n"
+                f"\nDay-by-Day Count:")
+    if kind == "count":
+        _, ordinal, counted = event
+        return f"✓ {date.fromordinal(ordinal).strftime('%A, %B %d')}: Business Day {counted}"
+    if kind == "skip":
+        _, ordinal, reason = event
+        return f"❌ {date.fromordinal(ordinal).strftime('%A, %B %d')}: Skipped ({reason})"
+    if kind == "day":
+        _, ordinal, counted, status = event
+        return f"Day {counted}: {date.fromordinal(ordinal).strftime('%A, %B %d')} ({status})"
+    if kind == "final":
+        return f"\n🎯 Final Date: {date.fromordinal(event[1])}"
+    return str(event)
+
+
+class DateCalculator:
+    """Performs date calculations based on WA State rules by default."""
+
+    @staticmethod
+    def calculate_business_days(base_date: date, days: int, forward: bool,
+                                trace: Optional[CalculationTrace] = None,
+                                calendar: BusinessDayCalendar = business_calendar) -> date:
+        """Calculates a date offset by business days."""
+        started = perf_counter()
+        final_date = calendar.offset(base_date, days, forward)
+        if trace is None:
+            _observe_day_count("business", started, base_date, final_date)
+            return final_date
+
+        trace.record("start", "Business Days", base_date.toordinal(), forward, days)
+        step = 1 if forward else -1
+        ordinal = base_date.toordinal() + step
+        days_counted = 0
+        while days_counted < days:
+            current_date = date.fromordinal(ordinal)
+            if calendar.is_business_day(current_date):
+                days_counted += 1
+                trace.record("count", ordinal, days_counted)
+            else:
+                trace.record("skip", ordinal, "Weekend" if current_date.weekday() >= 5 else "Holiday")
+            ordinal += step
+        trace.record("final", final_date.toordinal())
+        _observe_day_count("business", started, base_date, final_date)
+        return final_date
+
+    @staticmethod
+    def calculate_calendar_days(base_date: date, days: int, forward: bool,
+                                trace: Optional[CalculationTrace] = None,
+                                calendar: BusinessDayCalendar = business_calendar) -> date:
+        """Calculates a date offset by calendar days."""
+        started = perf_counter()
+        final_date = base_date + timedelta(days=days if forward else -days)
+        if trace is None:
+            _observe_day_count("calendar", started, base_date, final_date)
+            return final_date
+
+        trace.record("start", "Calendar Days", base_date.toordinal(), forward, days)
+        step = 1 if forward else -1
+        ordinal = base_date.toordinal()
+        for day_count in range(1, days + 1):
+            ordinal += step
+            current = date.fromordinal(ordinal)
+            status = ("Weekend" if current.weekday() >= 5 else
+                      "Holiday" if calendar.is_holiday(current) else "Regular Day")
+            trace.record("day", ordinal, day_count, status)
+        trace.record("final", final_date.toordinal())
+        _observe_day_count("calendar", started, base_date, final_date)
+        return final_date
+
+# Day counts up to this many are business days unless the item is a possession date
+BUSINESS_DAY_LIMIT = 5
+
+
+@dataclass
+class DaysSolution:
+    """The `days` values that put a contingency's deadline inside a date window.
+
+    Because counts up to BUSINESS_DAY_LIMIT are business days and longer ones
+    are calendar days, the deadline is not monotonic in `days` across that
+    threshold, so the answer can be two disjoint ranges.
+    """
+    timing_type: TimingType
+    ranges: List[Tuple[int, int]]  # inclusive (min, max) pairs, ascending and disjoint
+
+    @property
+    def min_days(self) -> Optional[int]:
+        return self.ranges[0][0] if self.ranges else None
+
+    @property
+    def max_days(self) -> Optional[int]:
+        return self.ranges[-1][1] if self.ranges else None
+
+    def __contains__(self, days: int) -> bool:
+        return any(low <= days <= high for low, high in self.ranges)
+
+
+class TimelineCalculator:
+    def __init__(self, mutual_date: date, closing_date: date,
+                 trace: Optional[CalculationTrace] = None,
+                 cache: Optional[DeadlineCache] = deadline_cache,
+                 jurisdiction: str = DEFAULT_JURISDICTION):
+        if mutual_date >= closing_date:
+            raise ValueError("Closing date must be after mutual acceptance date.")
+        self.mutual_date = mutual_date
+        self.closing_date = closing_date
+        self.trace = trace
+        self.cache = cache
+        self.jurisdiction = jurisdiction
+        self.calendar = calendar_for(jurisdiction)
+
+    @staticmethod
+    def calculation_method(contingency: Contingency) -> str:
+        """Returns how a contingency's date is counted."""
+        if contingency.timing_type == TimingType.FIXED_DATE:
+            return "Fixed Date"
+        if contingency.days <= BUSINESS_DAY_LIMIT and not contingency.is_possession_date:
+            return "Business Days"
+        return "Calendar Days"
+
+    def calculate_date(self, contingency: Contingency, anchor_date: Optional[date] = None) -> Optional[date]:
+        """Determines the effective date for a contingency.
+
+        DAYS_AFTER_CONTINGENCY items count forward from anchor_date, the
+        resolved date of the contingency they are anchored to.
+        """
+        started = perf_counter()
+        result = self._calculate_date(contingency, anchor_date)
+        _calculate_date_seconds[self.calculation_method(contingency)].observe(perf_counter() - started)
+        return result
+
+    def _calculate_date(self, contingency: Contingency, anchor_date: Optional[date]) -> Optional[date]:
+        trace = self.trace
+        if trace is not None:
+            trace.record("contingency", contingency.name, contingency.timing_type.value, contingency.days)
+
+        # Handle fixed dates first and return immediately
+        if contingency.timing_type == TimingType.FIXED_DATE:
+            if trace is not None:
+                trace.record("fixed")
+            if contingency.fixed_date is None:
+                raise ValueError("Fixed date must be set for fixed_date timing type")
+            return contingency.fixed_date
+
+        # For non-fixed dates, ensure we have days value
+        if contingency.days is None:
+            raise ValueError(f"'days' must be set for timing type {contingency.timing_type.value}")
+
+        # Rest of calculation for non-fixed dates
+        if contingency.timing_type == TimingType.DAYS_AFTER_CONTINGENCY:
+            if anchor_date is None:
+                raise ValueError(f"'{contingency.name}' needs the date of '{contingency.anchor}'")
+            base_date = anchor_date
+            forward = True
+        else:
+            is_from_mutual = contingency.timing_type.value == TimingType.DAYS_FROM_MUTUAL.value
+            base_date = self.mutual_date if is_from_mutual else self.closing_date
+            forward = is_from_mutual
+
+        business_days = contingency.days <= BUSINESS_DAY_LIMIT and not contingency.is_possession_date
+        calendar = self.calendar
+        if trace is None and self.cache is not None:
+            calculate = (DateCalculator.calculate_business_days if business_days
+                         else DateCalculator.calculate_calendar_days)
+            return self.cache.get_or_compute(
+                (calendar.name, calendar.version, base_date, contingency.days, forward, business_days),
+                lambda: calculate(base_date, contingency.days, forward, calendar=calendar)
+            )
+
+        if business_days:
+            return DateCalculator.calculate_business_days(
+                base_date=base_date,
+                days=contingency.days,
+                forward=forward,
+                trace=trace,
+                calendar=calendar
+            )
+        else:
+            return DateCalculator.calculate_calendar_days(
+                base_date=base_date,
+                days=contingency.days,
+                forward=forward,
+                trace=trace,
+                calendar=calendar
+            )
+
+    def solve_days(self, timing_type: TimingType, earliest: date, latest: date,
+                   is_possession_date: bool = False,
+                   anchor_date: Optional[date] = None) -> DaysSolution:
+        """Finds every `days` value whose deadline lands in [earliest, latest].
+
+        The inverse of calculate_date. Business-day counts are solved directly
+        from the calendar's running business-day totals and calendar-day
+        counts by subtraction, so nothing is stepped through day by day.
+        DAYS_AFTER_CONTINGENCY needs anchor_date, as in calculate_date.
+        """
+        if timing_type == TimingType.FIXED_DATE:
+            raise ValueError("Fixed-date contingencies have no day count to solve for")
+        if timing_type == TimingType.DAYS_AFTER_CONTINGENCY:
+            if anchor_date is None:
+                raise ValueError("Solving for days after a contingency needs its anchor date")
+            base_date, forward = anchor_date, True
+        elif timing_type == TimingType.DAYS_FROM_MUTUAL:
+            base_date, forward = self.mutual_date, True
+        else:
+            base_date, forward = self.closing_date, False
+
+        ranges = []
+        if earliest <= latest:
+            if not is_possession_date:
+                ranges.append(self._business_days_between(base_date, forward, earliest, latest))
+            # Calendar days: the deadline is just base_date -/+ days
+            low, high = ((earliest - base_date).days, (latest - base_date).days) if forward else \
+                        ((base_date - latest).days, (base_date - earliest).days)
+            ranges.append((max(low, 1 if is_possession_date else BUSINESS_DAY_LIMIT + 1), high))
+
+        merged = []
+        for low, high in ranges:
+            if low > high:
+                continue
+            if merged and low <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], high))
+            else:
+                merged.append((low, high))
+        return DaysSolution(timing_type, merged)
+
+    def _business_days_between(self, base_date: date, forward: bool,
+                               earliest: date, latest: date) -> Tuple[int, int]:
+        """Business-day counts from base_date whose deadline lands in the window.
+
+        With through(d) the running business-day total up to d, the deadline
+        for n days is the business day ranked through(base) + n going
+        forward, or through(base - 1) - n + 1 going backward; it lands in
+        the window exactly when that rank is in (through(earliest - 1), through(latest)].
+        """
+        through = self.calendar.business_days_through
+        before_window = through(earliest - timedelta(days=1))
+        window_end = through(latest)
+        if forward:
+            start = through(base_date)
+            low, high = before_window + 1 - start, window_end - start
+        else:
+            start = through(base_date - timedelta(days=1))
+            low, high = start + 1 - window_end, start - before_window
+        return max(low, 1), min(high, BUSINESS_DAY_LIMIT)
+
+    def solve_days_all(self, earliest: date, latest: date,
+                       is_possession_date: bool = False) -> Dict[TimingType, DaysSolution]:
+        """Solves for days from mutual and days before closing at once."""
+        return {timing_type: self.solve_days(timing_type, earliest, latest, is_possession_date)
+                for timing_type in (TimingType.DAYS_FROM_MUTUAL, TimingType.DAYS_BEFORE_CLOSING)}
+
+@dataclass
+class TimelineEntry:
+    """One calculated timeline row, kept numeric until display."""
+    name: str
+    date: date
+    days_from_mutual: int
+    form_input: str = "-"
+    calculation_method: str = "-"
+    is_milestone: bool = False
+
+
+class ContingencyGraph:
+    """Contingencies evaluated as a DAG of anchors, recalculated incrementally.
+
+    Each DAYS_AFTER_CONTINGENCY item is an edge from its anchor. Changing a
+    node marks it dirty; evaluate() recalculates only dirty nodes and their
+    downstream subgraph, in topological order, and raises ValueError on
+    cycles or anchors that do not exist. Changing the mutual or closing
+    date marks everything dirty.
+    """
+
+    def __init__(self, mutual_date: date, closing_date: date,
+                 trace: Optional[CalculationTrace] = None,
+                 jurisdiction: str = DEFAULT_JURISDICTION):
+        self.trace = trace
+        self.jurisdiction = jurisdiction
+        self._calculator = TimelineCalculator(mutual_date, closing_date, trace=trace,
+                                              jurisdiction=jurisdiction)
+        self._nodes: Dict[str, Contingency] = {}
+        self._dependents: Dict[str, Set[str]] = defaultdict(set)
+        self._dates: Dict[str, Optional[date]] = {}
+        self._dirty: Set[str] = set()
+        self.last_recomputed: List[str] = []
+
+    @property
+    def mutual_date(self) -> date:
+        return self._calculator.mutual_date
+
+    @property
+    def closing_date(self) -> date:
+        return self._calculator.closing_date
+
+    @property
+    def contingencies(self) -> Dict[str, Contingency]:
+        return self._nodes
+
+    def set_dates(self, mutual_date: date, closing_date: date):
+        """Changes the deal dates, marking every contingency dirty."""
+        if (mutual_date, closing_date) == (self.mutual_date, self.closing_date):
+            return
+        self._calculator = TimelineCalculator(mutual_date, closing_date, trace=self.trace,
+                                              jurisdiction=self.jurisdiction)
+        self._dirty.update(self._nodes)
+
+    def set(self, contingency: Contingency):
+        """Adds or replaces a contingency by name; unchanged inputs are a no-op."""
+        name = contingency.name
+        previous = self._nodes.get(name)
+        if previous == contingency:
+            return
+        if previous is not None and previous.anchor:
+            self._dependents[previous.anchor].discard(name)
+        if contingency.timing_type == TimingType.DAYS_AFTER_CONTINGENCY and contingency.anchor:
+            self._dependents[contingency.anchor].add(name)
+        self._nodes[name] = contingency
+        self._dirty.add(name)
+
+    def remove(self, name: str):
+        """Removes a contingency; anything anchored to it is re-evaluated."""
+        contingency = self._nodes.pop(name, None)
+        if contingency is None:
+            return
+        if contingency.anchor:
+            self._dependents[contingency.anchor].discard(name)
+        self._dates.pop(name, None)
+        self._dirty.discard(name)
+        self._dirty.update(self._dependents.get(name, ()))
+
+    def sync(self, contingencies: Iterable[Contingency]):
+        """Makes the graph match a list of contingencies, touching only differences."""
+        seen = set()
+        for contingency in contingencies:
+            if contingency.name in seen:
+                raise ValueError(f"Contingency names must be unique: '{contingency.name}'")
+            seen.add(contingency.name)
+            self.set(contingency)
+        for name in [n for n in self._nodes if n not in seen]:
+            self.remove(name)
+
+    def _downstream(self, names: Iterable[str]) -> Set[str]:
+        affected = set()
+        queue = deque(names)
+        while queue:
+            name = queue.popleft()
+            if name in affected or name not in self._nodes:
+                continue
+            affected.add(name)
+            queue.extend(self._dependents.get(name, ()))
+        return affected
+
+    def _cycle_from(self, name: str) -> List[str]:
+        """Follows anchors from a node left over by the sort until one repeats."""
+        path = []
+        while name not in path:
+            path.append(name)
+            name = self._nodes[name].anchor
+        return path[path.index(name):] + [name]
+
+    def evaluate(self) -> Dict[str, Optional[date]]:
+        """Recalculates dirty contingencies and everything downstream of them."""
+        affected = self._downstream(self._dirty)
+        pending = {}
+        for name in affected:
+            contingency = self._nodes[name]
+            anchor = contingency.anchor if contingency.timing_type == TimingType.DAYS_AFTER_CONTINGENCY else None
+            if anchor is not None and anchor not in self._nodes:
+                raise ValueError(f"'{name}' is anchored to unknown contingency '{anchor}'")
+            pending[name] = 1 if anchor in affected else 0
+
+        # Kahn's algorithm over the affected subgraph only
+        ready = deque(name for name, count in pending.items() if count == 0)
+        order = []
+        while ready:
+            name = ready.popleft()
+            order.append(name)
+            for dependent in self._dependents.get(name, ()):
+                if dependent in pending:
+                    pending[dependent] -= 1
+                    if pending[dependent] == 0:
+                        ready.append(dependent)
+        if len(order) < len(affected):
+            leftover = next(name for name in affected if pending[name] > 0)
+            raise ValueError("Contingency cycle: " + " -> ".join(self._cycle_from(leftover)))
+
+        for name in order:
+            contingency = self._nodes[name]
+            if not contingency.is_valid():
+                self._dates[name] = None
+            elif contingency.timing_type == TimingType.DAYS_AFTER_CONTINGENCY:
+                anchor_date = self._dates.get(contingency.anchor)
+                self._dates[name] = (None if anchor_date is None else
+                                     self._calculator.calculate_date(contingency, anchor_date))
+            else:
+                self._dates[name] = self._calculator.calculate_date(contingency)
+        self._dirty.clear()
+        self.last_recomputed = order
+        return self._dates
+
+
+def resolve_dates(mutual_date: date, closing_date: date, contingencies: List[Contingency],
+                  jurisdiction: str = DEFAULT_JURISDICTION) -> List[Optional[date]]:
+    """Calculates every contingency's date, resolving anchors; None for invalid ones."""
+    graph = ContingencyGraph(mutual_date, closing_date, jurisdiction=jurisdiction)
+    graph.sync(contingencies)
+    dates = graph.evaluate()
+    return [dates[c.name] for c in contingencies]
+
+
+class TimelineModel:
+    """Memoized timeline that recalculates only what changed.
+
+    Contingencies live in a ContingencyGraph, so editing one item
+    recalculates just that item and anything anchored to it; changing the
+    mutual or closing date recalculates everything.
+    """
+
+    def __init__(self, trace: Optional[CalculationTrace] = None,
+                 jurisdiction: str = DEFAULT_JURISDICTION):
+        self.trace = trace
+        self.jurisdiction = jurisdiction
+        self._graph: Optional[ContingencyGraph] = None
+        self._entries: Dict[str, TimelineEntry] = {}
+
+    @property
+    def mutual_date(self) -> Optional[date]:
+        return self._graph.mutual_date if self._graph else None
+
+    @property
+    def closing_date(self) -> Optional[date]:
+        return self._graph.closing_date if self._graph else None
+
+    def _entry(self, contingency: Contingency, calculated_date: Optional[date]) -> Optional[TimelineEntry]:
+        if not calculated_date:
+            return None
+
+        # Handle form input display based on timing type
+        if contingency.timing_type == TimingType.FIXED_DATE:
+            form_input = "Fixed Date"
+        elif contingency.timing_type == TimingType.DAYS_AFTER_CONTINGENCY:
+            form_input = f"{contingency.days} days after {contingency.anchor}"
+        else:
+            form_input = (f"{contingency.days} days " +
+                          ("from mutual" if contingency.timing_type == TimingType.DAYS_FROM_MUTUAL else
+                           "before closing"))
+
+        return TimelineEntry(
+            name=contingency.name,
+            date=calculated_date,
+            days_from_mutual=(calculated_date - self.mutual_date).days,
+            form_input=form_input,
+            calculation_method=TimelineCalculator.calculation_method(contingency)
+        )
+
+    def update(self, mutual_date: date, closing_date: date,
+               contingencies: List[Contingency]) -> List[TimelineEntry]:
+        """Returns the sorted timeline, recalculating only changed contingencies."""
+        if self._graph is None:
+            self._graph = ContingencyGraph(mutual_date, closing_date, trace=self.trace,
+                                           jurisdiction=self.jurisdiction)
+        else:
+            self._graph.set_dates(mutual_date, closing_date)
+
+        self._graph.sync(contingencies)
+        dates = self._graph.evaluate()
+        for name in self._graph.last_recomputed:
+            self._entries[name] = self._entry(self._graph.contingencies[name], dates[name])
+        # Dropping entries for removed contingencies keeps the memo bounded
+        self._entries = {name: self._entries[name] for name in self._graph.contingencies}
+
+        rows = [entry for entry in self._entries.values() if entry is not None]
+        rows.sort(key=lambda entry: entry.days_from_mutual)
+        return ([TimelineEntry("Mutual Acceptance", mutual_date, 0, is_milestone=True)] +
+                rows +
+                [TimelineEntry("Closing", closing_date, (closing_date - mutual_date).days,
+                               is_milestone=True)])
+
+
+def timeline_table(entries: List[TimelineEntry]) -> List[Dict[str, str]]:
+    """Formats timeline entries into display rows."""
+    table = []
+    for entry in entries:
+        is_start = entry.is_milestone and entry.days_from_mutual == 0
+        table.append({
+            "Event": entry.name,
+            "Date": format_date(entry.date),
+            "Days from Mutual": "0" if is_start else f"+{entry.days_from_mutual}",
+            "Form Input": entry.form_input,
+            "Calendar Days": "-" if is_start else f"{entry.days_from_mutual} days",
+            "Calculation Method": entry.calculation_method
+        })
+    return table
@@ -0,0 +1,246 @@
+"""In-process metrics in Prometheus text format, and a sampling profiler.
+
+Stdlib only, so the calculation core can record into it without adding a
+client library or slowing its import. Histograms keep per-thread bucket
+counts and are rendered cumulatively at scrape time; values that
+already live elsewhere, like DeadlineCache stats, are read through
+callbacks when rendered.
+"""
+import sys
+import threading
+from bisect import bisect_left
+from collections import Counter as _StackCounter
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3,
+                   2.5e-3, 5e-3, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+DAY_BUCKETS = (0, 1, 2, 3, 5, 7, 10, 14, 21, 30, 45, 60, 90, 180, 365)
+SIZE_BUCKETS = (1, 5, 10, 50, 100, 500, 1000, 5000, 10_000, 50_000, 100_000, 1_000_000)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _HistogramChild:
+    """One labelled series of a Histogram.
+
+    Each thread counts into its own shard, so observe() takes no lock;
+    shards are summed when rendered.
+    """
+    __slots__ = ("_bounds", "_local", "_shards", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._bounds = bounds
+        self._local = threading.local()
+        self._shards: List[list] = []
+        self._lock = threading.Lock()
+
+    def _new_shard(self) -> list:
+        # One count per bucket plus +Inf, then the running sum
+        shard = [0] * (len(self._bounds) + 1) + [0.0]
+        with self._lock:
+            self._shards.append(shard)
+        self._local.shard = shard
+        return shard
+
+    def observe(self, value: float):
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        shard[bisect_left(self._bounds, value)] += 1
+        shard[-1] += value
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        with self._lock:
+            shards = list(self._shards)
+        counts = [sum(column) for column in zip(*(shard[:-1] for shard in shards))]
+        return counts or [0] * (len(self._bounds) + 1), sum(shard[-1] for shard in shards)
+
+
+class Histogram:
+    """Distribution of observed values over fixed bucket bounds."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS,
+                 labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._bounds = tuple(sorted(buckets))
+        self._children: Dict[tuple, _HistogramChild] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values) -> _HistogramChild:
+        """Returns the series for a set of label values; hot paths should keep the result."""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, _HistogramChild(self._bounds))
+        return child
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, child in sorted(self._children.items()):
+            counts, total = child.snapshot()
+            cumulative = 0
+            for bound, count in zip(self._bounds + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames + ("le",), key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Counter:
+    """Monotonically increasing total."""
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, *labels):
+        key = tuple(str(v) for v in labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in values]
+
+
+class _Callback:
+    """A value read from elsewhere each time metrics are rendered."""
+
+    def __init__(self, name: str, help: str, read: Callable[[], float], kind: str):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self._read = read
+
+    def render(self) -> List[str]:
+        return [f"{self.name} {_format_value(self._read())}"]
+
+
+class MetricsRegistry:
+    """Named metrics rendered together in Prometheus text exposition format.
+
+    Registering a name twice returns the existing metric, so modules that
+    are imported more than once (or by several entry points) share series.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if existing.kind != metric.kind:
+                    raise ValueError(f"{metric.name} is already registered as a {existing.kind}")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS,
+                  labelnames: Sequence[str] = ()) -> Histogram:
+        return self._register(Histogram(name, help, buckets, labelnames))
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def callback(self, name: str, help: str, read: Callable[[], float], kind: str = "gauge"):
+        """Exposes a value read at scrape time, as a gauge or counter."""
+        self._register(_Callback(name, help, read, kind))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+class SamplingProfiler:
+    """Samples one thread's call stack at a fixed interval.
+
+    Use as a context manager, or start()/stop(), around the work to
+    profile. Stacks are aggregated in collapsed form ("outer;inner count"
+    per line), which flame graph tools read directly. On an asyncio event
+    loop thread, samples include whatever else the loop runs meanwhile.
+    """
+
+    def __init__(self, interval: float = 0.001, thread_id: Optional[int] = None, max_depth: int = 64):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.max_depth = max_depth
+        self.samples = _StackCounter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SamplingProfiler":
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._thread = threading.Thread(target=self._run, name="timeline-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self
+
+    def __enter__(self) -> "SamplingProfiler":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                code = frame.f_code
+                stack.append(f"{code.co_filename.rsplit('/', 1)[-1]}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """Returns the samples in collapsed-stack form, most frequent first."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())